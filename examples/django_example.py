@@ -7,8 +7,11 @@ Add this to your Django project's settings.py file.
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from mobile_secrets_vault import MobileSecretsVault, MasterKeyNotFoundError
+from types import MappingProxyType
+from mobile_secrets_vault import MobileSecretsVault, MasterKeyNotFoundError, VaultError
 
 # Build paths inside the project
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -19,7 +22,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 def load_secrets_vault():
     """
-    Load the secrets vault at Django startup.
+    Load the secrets vault.
     
     Returns:
         MobileSecretsVault instance or None if vault is not configured
@@ -45,14 +48,19 @@ def load_secrets_vault():
         return None
 
 
-# Initialize vault
+# Initialize vault once; the settings below need their secrets at import time,
+# so it is loaded before any of them are resolved
 SECRETS_VAULT = load_secrets_vault()
 
 
+@lru_cache(maxsize=None)
 def get_secret(key: str, default=None):
     """
     Get a secret from the vault or environment variables.
     
+    Results are cached per (key, default); call get_secret.cache_clear()
+    after setting secrets or rotating the master key.
+    
     Priority:
     1. Vault (if available)
     2. Environment variable
@@ -65,26 +73,51 @@ def get_secret(key: str, default=None):
     Returns:
         Secret value or default
     """
-    # Try vault first
-    if SECRETS_VAULT is not None:
+    # Try vault first (None if the vault is not configured)
+    if SECRETS_VAULT and key in SECRETS_VAULT:
         try:
             return SECRETS_VAULT.get(key)
-        except:
+        except VaultError:
             pass
     
     # Fall back to environment variable
     return os.getenv(key, default)
 
 
+# Secrets used by the settings below, with their defaults
+_SETTINGS_DEFAULTS = {
+    'DJANGO_SECRET_KEY': 'django-insecure-change-this-in-production',
+    'DB_NAME': 'mydb',
+    'DB_USER': 'postgres',
+    'DB_PASSWORD': 'postgres',
+    'DB_HOST': 'localhost',
+    'DB_PORT': '5432',
+    'EMAIL_HOST': 'smtp.gmail.com',
+    'EMAIL_PORT': '587',
+    'EMAIL_HOST_USER': '',
+    'EMAIL_HOST_PASSWORD': '',
+    'AWS_ACCESS_KEY_ID': None,
+    'AWS_SECRET_ACCESS_KEY': None,
+    'AWS_STORAGE_BUCKET_NAME': None,
+    'STRIPE_PUBLIC_KEY': None,
+    'STRIPE_SECRET_KEY': None,
+    'SENDGRID_API_KEY': None,
+}
+
+# Resolve every setting secret exactly once; immutable afterwards
+with ThreadPoolExecutor(max_workers=8) as executor:
+    _FROZEN = MappingProxyType(dict(zip(
+        _SETTINGS_DEFAULTS,
+        executor.map(get_secret, _SETTINGS_DEFAULTS, _SETTINGS_DEFAULTS.values()),
+    )))
+
+
 # ============================================================================
 # Django Settings Using Vault
 # ============================================================================
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = get_secret(
-    'DJANGO_SECRET_KEY',
-    default='django-insecure-change-this-in-production'
-)
+SECRET_KEY = _FROZEN['DJANGO_SECRET_KEY']
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv('DEBUG', 'False') == 'True'
@@ -122,33 +155,33 @@ WSGI_APPLICATION = 'myproject.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': get_secret('DB_NAME', 'mydb'),
-        'USER': get_secret('DB_USER', 'postgres'),
-        'PASSWORD': get_secret('DB_PASSWORD', 'postgres'),
-        'HOST': get_secret('DB_HOST', 'localhost'),
-        'PORT': get_secret('DB_PORT', '5432'),
+        'NAME': _FROZEN['DB_NAME'],
+        'USER': _FROZEN['DB_USER'],
+        'PASSWORD': _FROZEN['DB_PASSWORD'],
+        'HOST': _FROZEN['DB_HOST'],
+        'PORT': _FROZEN['DB_PORT'],
     }
 }
 
 
 # Email configuration using vault
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = get_secret('EMAIL_HOST', 'smtp.gmail.com')
-EMAIL_PORT = int(get_secret('EMAIL_PORT', '587'))
+EMAIL_HOST = _FROZEN['EMAIL_HOST']
+EMAIL_PORT = int(_FROZEN['EMAIL_PORT'])
 EMAIL_USE_TLS = True
-EMAIL_HOST_USER = get_secret('EMAIL_HOST_USER', '')
-EMAIL_HOST_PASSWORD = get_secret('EMAIL_HOST_PASSWORD', '')
+EMAIL_HOST_USER = _FROZEN['EMAIL_HOST_USER']
+EMAIL_HOST_PASSWORD = _FROZEN['EMAIL_HOST_PASSWORD']
 
 
 # Third-party service credentials
-AWS_ACCESS_KEY_ID = get_secret('AWS_ACCESS_KEY_ID')
-AWS_SECRET_ACCESS_KEY = get_secret('AWS_SECRET_ACCESS_KEY')
-AWS_STORAGE_BUCKET_NAME = get_secret('AWS_STORAGE_BUCKET_NAME')
+AWS_ACCESS_KEY_ID = _FROZEN['AWS_ACCESS_KEY_ID']
+AWS_SECRET_ACCESS_KEY = _FROZEN['AWS_SECRET_ACCESS_KEY']
+AWS_STORAGE_BUCKET_NAME = _FROZEN['AWS_STORAGE_BUCKET_NAME']
 
-STRIPE_PUBLIC_KEY = get_secret('STRIPE_PUBLIC_KEY')
-STRIPE_SECRET_KEY = get_secret('STRIPE_SECRET_KEY')
+STRIPE_PUBLIC_KEY = _FROZEN['STRIPE_PUBLIC_KEY']
+STRIPE_SECRET_KEY = _FROZEN['STRIPE_SECRET_KEY']
 
-SENDGRID_API_KEY = get_secret('SENDGRID_API_KEY')
+SENDGRID_API_KEY = _FROZEN['SENDGRID_API_KEY']
 
 
 # ============================================================================
@@ -160,6 +193,8 @@ Create this file: management/commands/set_secret.py
 from django.core.management.base import BaseCommand
 from django.conf import settings
 
+from myproject.settings import get_secret
+
 
 class Command(BaseCommand):
     help = 'Set a secret in the vault'
@@ -171,7 +206,7 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         vault = settings.SECRETS_VAULT
         
-        if vault is None:
+        if not vault:
             self.stdout.write(
                 self.style.ERROR('Vault not initialized. Run: vault init')
             )
@@ -182,6 +217,9 @@ class Command(BaseCommand):
         
         version = vault.set(key, value)
         
+        # Drop cached values so the new version is picked up
+        get_secret.cache_clear()
+        
         self.stdout.write(
             self.style.SUCCESS(
                 f"Successfully set '{key}' (version {version})"
@@ -207,7 +245,7 @@ def config_view(request):
     
     vault = settings.SECRETS_VAULT
     
-    if vault is None:
+    if not vault:
         return JsonResponse({
             'error': 'Vault not configured'
         }, status=500)
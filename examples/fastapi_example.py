@@ -6,7 +6,7 @@ Demonstrates how to integrate Mobile Secrets Vault with a FastAPI application.
 
 from fastapi import FastAPI, Depends, HTTPException
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 import os
 
 from mobile_secrets_vault import MobileSecretsVault
@@ -14,8 +14,61 @@ from mobile_secrets_vault import MobileSecretsVault
 # Initialize FastAPI app
 app = FastAPI(title="Mobile Secrets Vault - FastAPI Example")
 
+
+class CachedVault:
+    """
+    Per-process read-through cache in front of a vault.
+
+    Each (key, version) is decrypted once; later reads are a dict lookup.
+    Cached reads are not written to the audit log. Entries are invalidated
+    on set/delete and the whole cache is cleared on rotate.
+    """
+
+    def __init__(self, vault: MobileSecretsVault):
+        self._vault = vault
+        self._cache: Dict[Tuple[str, Optional[int]], Tuple[str, int]] = {}
+
+    def get(self, key: str, version: Optional[int] = None) -> str:
+        return self.get_with_version(key, version=version)[0]
+
+    def get_with_version(self, key: str, version: Optional[int] = None) -> Tuple[str, int]:
+        cache_key = (key, version)
+        try:
+            return self._cache[cache_key]
+        except KeyError:
+            result = self._vault.get_with_version(key, version=version)
+            self._cache[cache_key] = result
+            return result
+
+    def set(self, key: str, value: str, metadata: Optional[dict] = None) -> int:
+        version = self._vault.set(key, value, metadata=metadata)
+        self._invalidate(key)
+        return version
+
+    def delete(self, key: str) -> bool:
+        deleted = self._vault.delete(key)
+        self._invalidate(key)
+        return deleted
+
+    def rotate(self, new_key: Optional[bytes] = None) -> Optional[bytes]:
+        new_key = self._vault.rotate(new_key)
+        self._cache.clear()
+        return new_key
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._vault
+
+    def _invalidate(self, key: str) -> None:
+        for cache_key in [k for k in self._cache if k[0] == key]:
+            del self._cache[cache_key]
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything else (list_keys, list_versions, ...) goes to the vault
+        return getattr(self._vault, name)
+
+
 # Global vault instance (initialized at startup)
-vault: Optional[MobileSecretsVault] = None
+vault: Optional[CachedVault] = None
 
 
 # Startup event to load vault
@@ -25,10 +78,10 @@ async def startup_event():
     global vault
     
     try:
-        vault = MobileSecretsVault(
+        vault = CachedVault(MobileSecretsVault(
             master_key_file=os.getenv("VAULT_MASTER_KEY_FILE", ".vault/master.key"),
             secrets_filepath=os.getenv("VAULT_FILE", ".vault/secrets.yaml")
-        )
+        ))
         print("✅ Secrets vault loaded successfully")
     except Exception as e:
         print(f"❌ Failed to load secrets vault: {e}")
@@ -36,7 +89,7 @@ async def startup_event():
 
 
 # Dependency to get vault instance
-def get_vault() -> MobileSecretsVault:
+def get_vault() -> CachedVault:
     """Dependency to access the vault."""
     if vault is None:
         raise HTTPException(status_code=500, detail="Vault not initialized")
@@ -80,7 +133,7 @@ async def root():
 @app.post("/secrets", response_model=dict)
 async def create_secret(
     request: SecretRequest,
-    vault_instance: MobileSecretsVault = Depends(get_vault)
+    vault_instance: CachedVault = Depends(get_vault)
 ):
     """
     Create or update a secret.
@@ -105,7 +158,7 @@ async def create_secret(
 async def get_secret(
     key: str,
     version: Optional[int] = None,
-    vault_instance: MobileSecretsVault = Depends(get_vault)
+    vault_instance: CachedVault = Depends(get_vault)
 ):
     """
     Retrieve a secret.
@@ -113,16 +166,12 @@ async def get_secret(
     By default returns the latest version.
     """
     try:
-        value = vault_instance.get(key, version=version)
-        
-        # Get current version number
-        versions = vault_instance.list_versions(key)
-        current_version = versions[-1]['version'] if versions else 1
+        value, value_version = vault_instance.get_with_version(key, version=version)
         
         return SecretResponse(
             key=key,
             value=value,
-            version=version or current_version
+            version=value_version
         )
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"Secret not found: {e}")
@@ -131,7 +180,7 @@ async def get_secret(
 @app.delete("/secrets/{key}")
 async def delete_secret(
     key: str,
-    vault_instance: MobileSecretsVault = Depends(get_vault)
+    vault_instance: CachedVault = Depends(get_vault)
 ):
     """Delete a secret and all its versions."""
     try:
@@ -149,7 +198,7 @@ async def delete_secret(
 @app.get("/secrets/{key}/versions", response_model=list[VersionInfo])
 async def list_secret_versions(
     key: str,
-    vault_instance: MobileSecretsVault = Depends(get_vault)
+    vault_instance: CachedVault = Depends(get_vault)
 ):
     """List all versions for a secret."""
     try:
@@ -161,7 +210,7 @@ async def list_secret_versions(
 
 @app.get("/secrets")
 async def list_secrets(
-    vault_instance: MobileSecretsVault = Depends(get_vault)
+    vault_instance: CachedVault = Depends(get_vault)
 ):
     """List all secret keys."""
     try:
@@ -178,7 +227,7 @@ async def list_secrets(
 async def get_audit_log(
     key: Optional[str] = None,
     limit: int = 50,
-    vault_instance: MobileSecretsVault = Depends(get_vault)
+    vault_instance: CachedVault = Depends(get_vault)
 ):
     """Get audit log entries."""
     try:
@@ -193,7 +242,7 @@ async def get_audit_log(
 
 @app.post("/rotate")
 async def rotate_key(
-    vault_instance: MobileSecretsVault = Depends(get_vault)
+    vault_instance: CachedVault = Depends(get_vault)
 ):
     """
     Rotate the master encryption key.
@@ -218,7 +267,7 @@ async def rotate_key(
 
 # Example usage of secrets in application logic
 @app.get("/config")
-async def get_config(vault_instance: MobileSecretsVault = Depends(get_vault)):
+async def get_config(vault_instance: CachedVault = Depends(get_vault)):
     """
     Example endpoint that uses secrets from the vault.
     
@@ -230,10 +279,7 @@ async def get_config(vault_instance: MobileSecretsVault = Depends(get_vault)):
         
         # Try to get some example secrets
         for key in ['DATABASE_URL', 'API_KEY', 'JWT_SECRET']:
-            try:
-                config[key] = vault_instance.get(key)
-            except:
-                config[key] = None
+            config[key] = vault_instance.get(key) if key in vault_instance else None
         
         return {
             "message": "Application configuration",
@@ -0,0 +1,3 @@
+"""Package version for Mobile Secrets Vault."""
+
+__version__ = "0.1.0"
@@ -1,15 +1,30 @@
 """Mobile Secrets Vault - Secure secrets management for mobile backends."""
 
-__version__ = "0.1.0"
+from typing import TYPE_CHECKING, Any
 
-from .vault import (
-    MobileSecretsVault,
-    VaultError,
-    MasterKeyNotFoundError,
-    SecretNotFoundError,
-)
-from .crypto import CryptoEngine
-from .audit import AuditLogger, Operation
+from .__about__ import __version__
+
+if TYPE_CHECKING:
+    from .vault import (
+        MobileSecretsVault,
+        VaultError,
+        MasterKeyNotFoundError,
+        SecretNotFoundError,
+    )
+    from .crypto import CryptoEngine
+    from .audit import AuditLogger, Operation
+
+# Public names and the submodule that defines them. Submodules (and their
+# cryptography/PyYAML dependencies) are imported on first attribute access.
+_LAZY_IMPORTS = {
+    "MobileSecretsVault": "vault",
+    "VaultError": "vault",
+    "MasterKeyNotFoundError": "vault",
+    "SecretNotFoundError": "vault",
+    "CryptoEngine": "crypto",
+    "AuditLogger": "audit",
+    "Operation": "audit",
+}
 
 __all__ = [
     "MobileSecretsVault",
@@ -21,3 +36,19 @@ __all__ = [
     "Operation",
     "__version__",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> Any:
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
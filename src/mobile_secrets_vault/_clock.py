@@ -0,0 +1,24 @@
+"""
+Timestamp helpers shared by the versioning and audit modules.
+"""
+
+import time
+
+# (epoch second, formatted "YYYY-MM-DDTHH:MM:SS") of the last timestamp
+_second_prefix = (-1, "")
+
+
+def iso_utc_now() -> str:
+    """
+    Return the current UTC time as an ISO-8601 string ending in 'Z'.
+
+    Reads the clock as an integer and only re-formats the date/time prefix
+    when the second changes.
+    """
+    global _second_prefix
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached_seconds, prefix = _second_prefix
+    if seconds != cached_seconds:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _second_prefix = (seconds, prefix)
+    return f"{prefix}.{nanos // 1000:06d}Z"
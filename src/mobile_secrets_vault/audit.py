@@ -5,11 +5,159 @@ Tracks all operations performed on secrets with timestamps and metadata.
 """
 
 import json
-from datetime import datetime
+import os
+import threading
+import weakref
+from collections import defaultdict, deque
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import Callable, Deque, List, Dict, Iterator, Optional, Any, IO, Tuple
 from enum import Enum
 
+from ._clock import iso_utc_now
+
+_encode_str = json.encoder.encode_basestring_ascii
+
+
+def _encode_entry(entry: Dict[str, Any]) -> bytes:
+    """
+    Serialize an audit entry to compact JSON bytes, as json.dumps would.
+
+    The fixed fields are written from a template; only non-empty metadata
+    goes through the generic encoder.
+    """
+    key = entry["key"]
+    error = entry["error"]
+    metadata = entry["metadata"]
+    if (
+        type(entry["timestamp"]) is not str
+        or type(entry["operation"]) is not str
+        or not (key is None or type(key) is str)
+        or not (error is None or type(error) is str)
+        or type(entry["success"]) is not bool
+        or len(entry) != 6
+    ):
+        return json.dumps(entry, separators=(",", ":")).encode("utf-8")
+
+    return (
+        '{"timestamp":'
+        + _encode_str(entry["timestamp"])
+        + ',"operation":'
+        + _encode_str(entry["operation"])
+        + ',"key":'
+        + ("null" if key is None else _encode_str(key))
+        + ',"success":'
+        + ("true" if entry["success"] else "false")
+        + ',"error":'
+        + ("null" if error is None else _encode_str(error))
+        + ',"metadata":'
+        + (json.dumps(metadata, separators=(",", ":")) if metadata else "{}")
+        + "}"
+    ).encode("ascii")
+
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        """Serialize an object to compact JSON bytes."""
+        return orjson.dumps(obj)
+
+    def _dumps_indented(obj: Any) -> bytes:
+        """Serialize an object to JSON bytes indented by two spaces."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    def _loads(data: bytes) -> Any:
+        """Parse JSON bytes."""
+        return orjson.loads(data)
+
+    # orjson serializes a whole entry faster than the template
+    _dumps_entry: Callable[[Dict[str, Any]], bytes] = _dumps
+
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+
+    def _dumps(obj: Any) -> bytes:
+        """Serialize an object to compact JSON bytes."""
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def _dumps_indented(obj: Any) -> bytes:
+        """Serialize an object to JSON bytes indented by two spaces."""
+        return json.dumps(obj, indent=2).encode("utf-8")
+
+    def _loads(data: bytes) -> Any:
+        """Parse JSON bytes."""
+        return json.loads(data)
+
+    _dumps_entry = _encode_entry
+
+
+class _LogFileWriter:
+    """
+    Append handle and pending lines of an audit log file.
+
+    Kept apart from the logger so that the logger's finalizer can write
+    and close it without holding a reference to the logger itself.
+    """
+
+    __slots__ = ("path", "fh", "buffer", "end")
+
+    def __init__(self, path: Path, buffer: List[bytes]):
+        self.path = path
+        self.fh: Optional[IO[bytes]] = None
+        self.buffer = buffer
+        # Expected file size if only this writer appended since the logger
+        # loaded it; None once that is unknown (a failed or skipped write)
+        self.end: Optional[int] = 0
+
+    def write(self) -> None:
+        """Write all buffered lines, opening the file on first use."""
+        if not self.buffer:
+            return
+        try:
+            if self.fh is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.fh = open(self.path, "ab", buffering=1 << 16)
+            data = b"".join(self.buffer)
+            self.fh.write(data)
+            self.fh.flush()
+            if self.end is not None:
+                self.end += len(data)
+        except Exception:
+            # If we can't write to file, continue with in-memory only
+            self.end = None
+        self.buffer.clear()
+
+    def close(self) -> bool:
+        """Write buffered lines and close the handle; returns whether it was open."""
+        self.write()
+        if self.fh is None:
+            return False
+        try:
+            self.fh.close()
+        except Exception:
+            pass
+        self.fh = None
+        return True
+
+
+def _finalize_logger(writer: _LogFileWriter, stop_flusher: threading.Event) -> None:
+    """Stop a collected (or exiting) logger's flusher and write out its partial batch."""
+    stop_flusher.set()
+    writer.close()
+
+
+def _flush_periodically(
+    logger_ref: "weakref.ReferenceType[AuditLogger]", stop: threading.Event, interval: float
+) -> None:
+    """Write a logger's partial batch every interval until stopped or collected."""
+    while not stop.wait(interval):
+        logger = logger_ref()
+        if logger is None:
+            return
+        logger._write_pending()
+        del logger
+
 
 class Operation(Enum):
     """Enumeration of vault operations that can be audited."""
@@ -32,19 +180,90 @@ class AuditLogger:
     - When it happened
     - Whether it succeeded
     - Additional metadata
+
+    Only the most recent ``max_in_memory`` entries are kept in memory; when
+    a log file is configured, older entries remain on disk.
     """
 
-    def __init__(self, log_file: Optional[Path] = None, in_memory: bool = False):
+    __slots__ = (
+        "log_file",
+        "in_memory",
+        "batch_size",
+        "max_in_memory",
+        "_memory_logs",
+        "_by_key",
+        "_by_op",
+        "_by_key_op",
+        "_writer",
+        "_buffer",
+        "_lock",
+        "flush_interval_ms",
+        "_stop_flusher",
+        "_flusher",
+        "__weakref__",
+    )
+
+    # Default number of entries kept in the in-memory window
+    DEFAULT_MAX_IN_MEMORY = 10_000
+
+    # Columns written by CSV exports
+    CSV_FIELDNAMES = ("timestamp", "operation", "key", "success", "error")
+
+    def __init__(
+        self,
+        log_file: Optional[Path] = None,
+        in_memory: bool = False,
+        batch_size: int = 1,
+        max_in_memory: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+    ):
         """
         Initialize the audit logger.
 
         Args:
             log_file: Path to persistent log file (optional)
             in_memory: If True, keep logs in memory only
+            batch_size: Number of entries to buffer before writing to the log file
+            max_in_memory: Maximum number of entries kept in memory (oldest are dropped)
+            flush_interval_ms: If set, a background thread writes a partial batch
+                after at most this many milliseconds
         """
         self.log_file = log_file
         self.in_memory = in_memory
-        self._memory_logs: List[Dict[str, Any]] = []
+        self.batch_size = max(1, batch_size)
+        self.max_in_memory = max_in_memory or self.DEFAULT_MAX_IN_MEMORY
+        self._memory_logs: Deque[Dict[str, Any]] = deque(maxlen=self.max_in_memory)
+
+        # Indexes into _memory_logs by secret key and operation value
+        self._by_key: Dict[Optional[str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._by_op: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._by_key_op: Dict[Tuple[Optional[str], str], Deque[Dict[str, Any]]] = defaultdict(deque)
+
+        # Pending lines and the writer holding the lazily opened append handle
+        self._buffer: List[bytes] = []
+        self._writer: Optional[_LogFileWriter] = None
+
+        # Guards the in-memory window, indexes and file buffer across threads
+        self._lock = threading.RLock()
+
+        # Background writer for partial batches
+        self.flush_interval_ms = flush_interval_ms
+        self._stop_flusher = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if flush_interval_ms and self.batch_size > 1 and self.log_file and not self.in_memory:
+            self._flusher = threading.Thread(
+                target=_flush_periodically,
+                args=(weakref.ref(self), self._stop_flusher, flush_interval_ms / 1000),
+                name="audit-log-flusher",
+                daemon=True,
+            )
+            self._flusher.start()
+
+        # Write the partial batch when the logger is collected or the process
+        # exits; the finalizer only references the writer, not the logger
+        if self.log_file and not self.in_memory:
+            self._writer = _LogFileWriter(self.log_file, self._buffer)
+            weakref.finalize(self, _finalize_logger, self._writer, self._stop_flusher)
 
         # Load existing logs if file exists
         if self.log_file and self.log_file.exists():
@@ -56,6 +275,7 @@ class AuditLogger:
         key: Optional[str] = None,
         success: bool = True,
         error: Optional[str] = None,
+        sync: bool = False,
         **metadata: Any,
     ) -> None:
         """
@@ -66,10 +286,11 @@ class AuditLogger:
             key: The secret key being accessed (if applicable)
             success: Whether the operation succeeded
             error: Error message if operation failed
+            sync: If True, flush buffered entries and fsync the log file
             **metadata: Additional metadata to include
         """
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": iso_utc_now(),
             "operation": operation.value,
             "key": key,
             "success": success,
@@ -77,11 +298,14 @@ class AuditLogger:
             "metadata": metadata or {},
         }
 
-        self._memory_logs.append(log_entry)
+        with self._lock:
+            self._add_entry(log_entry)
 
-        # Persist to file if configured
-        if self.log_file and not self.in_memory:
-            self._append_to_file(log_entry)
+            # Persist to file if configured
+            if self.log_file and not self.in_memory:
+                self._append_to_file(log_entry)
+                if sync:
+                    self.flush()
 
     def get_logs(
         self,
@@ -100,53 +324,228 @@ class AuditLogger:
         Returns:
             List of audit log entries
         """
-        logs = self._memory_logs.copy()
+        # Start from the smallest candidate set; entries are kept in append order
+        logs: Iterator[Dict[str, Any]]
+        with self._lock:
+            if key is not None and operation is not None:
+                logs = reversed(self._by_key_op.get((key, operation.value), deque()))
+            elif key is not None:
+                logs = reversed(self._by_key.get(key, deque()))
+            elif operation is not None:
+                logs = reversed(self._by_op.get(operation.value, deque()))
+            else:
+                logs = reversed(self._memory_logs)
 
-        # Apply filters
-        if key is not None:
-            logs = [log for log in logs if log["key"] == key]
+            # Most recent first
+            return list(islice(logs, None if limit is None else max(limit, 0)))
 
-        if operation is not None:
-            logs = [log for log in logs if log["operation"] == operation.value]
+    def _add_entry(self, log_entry: Dict[str, Any]) -> None:
+        """Append a log entry to the in-memory window and its indexes."""
+        if len(self._memory_logs) == self.max_in_memory:
+            # The evicted entry is also the oldest one in both of its indexes
+            evicted = self._memory_logs[0]
+            self._unindex(self._by_key, evicted.get("key"))
+            self._unindex(self._by_op, evicted["operation"])
+            self._unindex(self._by_key_op, (evicted.get("key"), evicted["operation"]))
 
-        # Sort by timestamp descending (most recent first)
-        logs.sort(key=lambda x: x["timestamp"], reverse=True)
-
-        # Apply limit
-        if limit is not None:
-            logs = logs[:limit]
+        self._memory_logs.append(log_entry)
+        self._by_key[log_entry.get("key")].append(log_entry)
+        self._by_op[log_entry["operation"]].append(log_entry)
+        self._by_key_op[(log_entry.get("key"), log_entry["operation"])].append(log_entry)
 
-        return logs
+    @staticmethod
+    def _unindex(index: Dict[Any, Deque[Dict[str, Any]]], value: Any) -> None:
+        """Drop the oldest entry stored under ``value`` in an index."""
+        entries = index.get(value)
+        if entries:
+            entries.popleft()
+            if not entries:
+                del index[value]
 
     def clear_logs(self) -> None:
         """Clear all audit logs (use with caution!)."""
-        self._memory_logs.clear()
-        if self.log_file and self.log_file.exists():
-            self.log_file.unlink()
+        with self._lock:
+            self._memory_logs.clear()
+            self._by_key.clear()
+            self._by_op.clear()
+            self._by_key_op.clear()
+            self._buffer.clear()
+            # Close just the file; the flusher keeps serving later entries
+            if self._writer is not None:
+                self._writer.close()
+                self._writer.end = 0
+            if self.log_file and self.log_file.exists():
+                self.log_file.unlink()
+            if self.log_file and self._snapshot_path().exists():
+                self._snapshot_path().unlink()
 
     def _load_logs(self) -> None:
-        """Load existing logs from file."""
+        """Load the most recent ``max_in_memory`` logs from file."""
         if self.log_file is None:
             return
+        end: Optional[int]
+        snapshot = self._load_snapshot()
+        if snapshot is not None:
+            entries, end = snapshot
+        else:
+            try:
+                with open(self.log_file, "rb") as f:
+                    end = os.fstat(f.fileno()).st_size
+                    lines = self._read_tail(f, self.max_in_memory, end=end)
+                    entries = [_loads(line) for line in lines]
+            except Exception as e:
+                # If we can't load logs, start fresh
+                entries, end = [], None
+            else:
+                self._write_snapshot(entries, end)
+        if self._writer is not None:
+            self._writer.end = end
+
+        # get_logs relies on append order; restore it once if the file was
+        # appended out of order (e.g. by another process)
+        timestamps = [entry.get("timestamp", "") for entry in entries]
+        if any(a > b for a, b in zip(timestamps, timestamps[1:])):
+            entries.sort(key=lambda entry: entry.get("timestamp", ""))
+
+        for log_entry in entries:
+            self._add_entry(log_entry)
+
+    @staticmethod
+    def _read_tail(
+        f: IO[bytes], count: int, block_size: int = 1 << 16, end: Optional[int] = None
+    ) -> List[bytes]:
+        """
+        Read the last ``count`` non-empty lines of a file.
+
+        Reads backwards from ``end`` (default: the end of the file) in blocks
+        so only the tail of a large log file is read and parsed.
+        """
+        pos = f.seek(0, os.SEEK_END) if end is None else end
+        chunks: List[bytes] = []
+        newlines = 0
+        while pos > 0 and newlines <= count:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+
+        lines = b"".join(reversed(chunks)).split(b"\n")
+        if pos > 0:
+            # The first line may start before the data we read
+            lines = lines[1:]
+        return [line for line in lines if line.strip()][-count:]
+
+    def _snapshot_path(self) -> Path:
+        """Path of the parsed-log snapshot stored next to the log file."""
+        assert self.log_file is not None
+        return self.log_file.with_name(self.log_file.name + ".cache")
+
+    def _load_snapshot(self) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+        """
+        Load entries from the snapshot if it matches the log file.
+
+        The snapshot records the log file's mtime and size; any change to
+        the log file makes it stale.
+
+        Returns:
+            The entries and the log file size they cover, or None
+        """
+        if self.log_file is None:
+            return None
         try:
-            with open(self.log_file, "r") as f:
-                self._memory_logs = [json.loads(line) for line in f if line.strip()]
-        except Exception as e:
-            # If we can't load logs, start fresh
-            self._memory_logs = []
+            stat = os.stat(self.log_file)
+            snapshot = _loads(self._snapshot_path().read_bytes())
+            if (
+                snapshot["mtime_ns"] != stat.st_mtime_ns
+                or snapshot["size"] != stat.st_size
+                or snapshot["max_in_memory"] < self.max_in_memory
+            ):
+                return None
+            entries: List[Dict[str, Any]] = snapshot["entries"]
+            return entries[-self.max_in_memory :], stat.st_size
+        except Exception:
+            return None
 
-    def _append_to_file(self, log_entry: Dict[str, Any]) -> None:
-        """Append a single log entry to the file."""
+    def _write_snapshot(self, entries: List[Dict[str, Any]], end: int) -> None:
+        """
+        Save the tail of the log file for the next load.
+
+        ``entries`` must be the last entries of the first ``end`` bytes of
+        the file. Nothing is saved if the file has another size by now, e.g.
+        because another logger appended to it.
+        """
         if self.log_file is None:
             return
         try:
-            self.log_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.log_file, "a") as f:
-                f.write(json.dumps(log_entry) + "\n")
+            stat = os.stat(self.log_file)
+            if stat.st_size != end:
+                return
+            snapshot_path = self._snapshot_path()
+            temp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+            temp_path.write_bytes(
+                _dumps(
+                    {
+                        "mtime_ns": stat.st_mtime_ns,
+                        "size": stat.st_size,
+                        "max_in_memory": self.max_in_memory,
+                        "entries": entries,
+                    }
+                )
+            )
+            os.replace(temp_path, snapshot_path)
         except Exception:
-            # If we can't write to file, continue with in-memory only
+            # The snapshot is only a cache; the log file stays authoritative
             pass
 
+    def _append_to_file(self, log_entry: Dict[str, Any]) -> None:
+        """Buffer a single log entry, writing the batch once it is full."""
+        if self.log_file is None:
+            return
+        try:
+            self._buffer.append(_dumps_entry(log_entry) + b"\n")
+        except Exception:
+            # Entries that cannot be serialized stay in memory only
+            if self._writer is not None:
+                self._writer.end = None
+            return
+        if len(self._buffer) >= self.batch_size:
+            self._write_buffer()
+
+    def _write_buffer(self) -> None:
+        """Write all buffered entries through the persistent file handle."""
+        if self._writer is not None:
+            self._writer.write()
+        else:
+            self._buffer.clear()
+
+    def flush(self) -> None:
+        """Write any buffered entries and fsync the log file for durability."""
+        with self._lock:
+            self._write_buffer()
+            fh = self._writer.fh if self._writer is not None else None
+            if fh is not None:
+                try:
+                    os.fsync(fh.fileno())
+                except Exception:
+                    pass
+
+    def _write_pending(self) -> None:
+        """Write buffered entries without syncing; used by the background flusher."""
+        with self._lock:
+            self._write_buffer()
+
+    def close(self) -> None:
+        """Flush buffered entries and close the log file handle."""
+        self._stop_flusher.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        with self._lock:
+            writer = self._writer
+            if writer is not None and writer.close() and writer.end is not None:
+                self._write_snapshot(list(self._memory_logs), writer.end)
+
     def export_logs(self, output_path: Path, format: str = "json") -> None:
         """
         Export audit logs to a file.
@@ -158,16 +557,47 @@ class AuditLogger:
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         if format == "json":
-            with open(output_path, "w") as f:
-                json.dump(self._memory_logs, f, indent=2)
+            # Stream the array one entry at a time instead of building it whole
+            with open(output_path, "wb") as f:
+                f.write(b"[")
+                separator = b"\n"
+                for log in self._memory_logs:
+                    f.write(separator + _dumps_indented(log))
+                    separator = b",\n"
+                f.write(b"\n]\n")
         elif format == "csv":
             import csv
 
             with open(output_path, "w", newline="") as f:
                 if self._memory_logs:
-                    fieldnames = ["timestamp", "operation", "key", "success", "error"]
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-                    for log in self._memory_logs:
-                        row = {k: log.get(k) for k in fieldnames}
-                        writer.writerow(row)
+                    fieldnames = self.CSV_FIELDNAMES
+                    getter = itemgetter(*fieldnames)
+                    required = frozenset(fieldnames)
+                    writer = csv.writer(f)
+                    writer.writerow(fieldnames)
+                    # Entries written by log() always have every column
+                    writer.writerows(
+                        getter(log) if required <= log.keys() else [log.get(k) for k in fieldnames]
+                        for log in self._memory_logs
+                    )
+
+
+class NullAuditLogger(AuditLogger):
+    """Audit logger that discards every entry; used by vaults opened with audit=False."""
+
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        """Initialize an empty, in-memory logger."""
+        super().__init__(in_memory=True)
+
+    def log(
+        self,
+        operation: Operation,
+        key: Optional[str] = None,
+        success: bool = True,
+        error: Optional[str] = None,
+        sync: bool = False,
+        **metadata: Any,
+    ) -> None:
+        """Discard an audit log entry."""
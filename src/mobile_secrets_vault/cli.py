@@ -4,13 +4,18 @@ Command-line interface for Mobile Secrets Vault.
 Provides commands for initializing, managing, and rotating secrets.
 """
 
+import os
 import sys
 import click
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Collection, Optional
 
-from . import MobileSecretsVault, CryptoEngine, __version__
-from .vault import MasterKeyNotFoundError, SecretNotFoundError
+# Only the version is imported eagerly; commands import the vault stack
+# (cryptography, PyYAML) when they run, keeping --help/--version fast.
+from .__about__ import __version__
+
+if TYPE_CHECKING:
+    from .vault import MobileSecretsVault
 
 
 # Global options
@@ -41,6 +46,43 @@ def cli(ctx: click.Context, vault_file: str, master_key_file: Optional[str]) ->
     ctx.obj["master_key_file"] = master_key_file
 
 
+def _get_vault(ctx: click.Context, keys: Optional[Collection[str]] = None) -> "MobileSecretsVault":
+    """
+    Return the vault for this invocation, constructing it on first use.
+
+    Read-only commands pass the keys they need so only those secrets are
+    loaded; such partial vaults are not cached for other commands.
+    """
+    vault: Optional["MobileSecretsVault"] = ctx.obj.get("vault")
+    if vault is None:
+        from .vault import MobileSecretsVault
+
+        vault = MobileSecretsVault(
+            master_key_file=ctx.obj["master_key_file"],
+            secrets_filepath=ctx.obj["vault_file"],
+            keys=keys,
+        )
+        if keys is None:
+            ctx.obj["vault"] = vault
+    return vault
+
+
+def _write_key_securely(path: Path, key: bytes) -> None:
+    """Write a key file that is created with owner-only permissions."""
+    # Replace any existing file so O_EXCL guarantees the 0o600 mode
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        view = memoryview(key)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
 @cli.command()
 @click.option(
     "--output-dir", type=click.Path(), default=".vault", help="Directory to create vault files"
@@ -48,6 +90,8 @@ def cli(ctx: click.Context, vault_file: str, master_key_file: Optional[str]) ->
 @click.option("--force", is_flag=True, help="Overwrite existing files without confirmation")
 def init(output_dir: str, force: bool) -> None:
     """Initialize a new vault with master key and secrets file."""
+    from .crypto import CryptoEngine
+
     output_path = Path(output_dir)
     key_file = output_path / "master.key"
     secrets_file = output_path / "secrets.yaml"
@@ -66,15 +110,8 @@ def init(output_dir: str, force: bool) -> None:
     # Generate master key
     master_key = CryptoEngine.generate_key()
 
-    # Save master key
-    with open(key_file, "wb") as f:
-        f.write(master_key)
-
-    # Set restrictive permissions on key file (Unix only)
-    try:
-        key_file.chmod(0o600)
-    except Exception:
-        pass
+    # Save master key, readable only by the owner from the moment it exists
+    _write_key_securely(key_file, master_key)
 
     # Create empty secrets file
     secrets_file.touch()
@@ -96,6 +133,8 @@ def init(output_dir: str, force: bool) -> None:
 @click.pass_context
 def set(ctx: click.Context, key: str, value: Optional[str], stdin: bool) -> None:
     """Set or update a secret value."""
+    from .vault import MasterKeyNotFoundError
+
     # Get value from stdin if requested
     if stdin:
         value = click.get_text_stream("stdin").read().strip()
@@ -103,9 +142,7 @@ def set(ctx: click.Context, key: str, value: Optional[str], stdin: bool) -> None
         value = click.prompt(f"Enter value for '{key}'", hide_input=True)
 
     try:
-        vault = MobileSecretsVault(
-            master_key_file=ctx.obj["master_key_file"], secrets_filepath=ctx.obj["vault_file"]
-        )
+        vault = _get_vault(ctx)
 
         version = vault.set(key, value)
         click.echo(f"✅ Secret '{key}' set successfully (version {version})")
@@ -126,10 +163,10 @@ def set(ctx: click.Context, key: str, value: Optional[str], stdin: bool) -> None
 @click.pass_context
 def get(ctx: click.Context, key: str, version: Optional[int], raw: bool) -> None:
     """Retrieve and display a secret value."""
+    from .vault import MasterKeyNotFoundError, SecretNotFoundError
+
     try:
-        vault = MobileSecretsVault(
-            master_key_file=ctx.obj["master_key_file"], secrets_filepath=ctx.obj["vault_file"]
-        )
+        vault = _get_vault(ctx, keys=(key,))
 
         value = vault.get(key, version=version)
 
@@ -157,6 +194,8 @@ def get(ctx: click.Context, key: str, version: Optional[int], raw: bool) -> None
 @click.pass_context
 def delete(ctx: click.Context, key: str, yes: bool) -> None:
     """Delete a secret and all its versions."""
+    from .vault import MasterKeyNotFoundError
+
     if not yes:
         confirmation = click.confirm(
             f"Are you sure you want to delete '{key}' and all its versions?"
@@ -166,9 +205,7 @@ def delete(ctx: click.Context, key: str, yes: bool) -> None:
             return
 
     try:
-        vault = MobileSecretsVault(
-            master_key_file=ctx.obj["master_key_file"], secrets_filepath=ctx.obj["vault_file"]
-        )
+        vault = _get_vault(ctx)
 
         deleted = vault.delete(key)
 
@@ -192,6 +229,9 @@ def delete(ctx: click.Context, key: str, yes: bool) -> None:
 @click.pass_context
 def rotate(ctx: click.Context, new_key_file: Optional[str], yes: bool) -> None:
     """Rotate the master encryption key (re-encrypt all secrets)."""
+    from .crypto import CryptoEngine
+    from .vault import MasterKeyNotFoundError
+
     if not yes:
         confirmation = click.confirm(
             "⚠️  This will re-encrypt all secrets with a new master key. Continue?"
@@ -201,9 +241,7 @@ def rotate(ctx: click.Context, new_key_file: Optional[str], yes: bool) -> None:
             return
 
     try:
-        vault = MobileSecretsVault(
-            master_key_file=ctx.obj["master_key_file"], secrets_filepath=ctx.obj["vault_file"]
-        )
+        vault = _get_vault(ctx)
 
         secret_count = len(vault.list_keys())
 
@@ -215,13 +253,7 @@ def rotate(ctx: click.Context, new_key_file: Optional[str], yes: bool) -> None:
         if new_key_file and new_key:
             output_path = Path(new_key_file)
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, "wb") as f:
-                f.write(new_key)
-
-            try:
-                output_path.chmod(0o600)
-            except Exception:
-                pass
+            _write_key_securely(output_path, new_key)
 
             click.echo(f"✅ Rotation complete! New key saved to: {output_path}")
         elif new_key:
@@ -245,10 +277,10 @@ def rotate(ctx: click.Context, new_key_file: Optional[str], yes: bool) -> None:
 @click.pass_context
 def list_versions(ctx: click.Context, key: str) -> None:
     """Show version history for a secret."""
+    from .vault import MasterKeyNotFoundError
+
     try:
-        vault = MobileSecretsVault(
-            master_key_file=ctx.obj["master_key_file"], secrets_filepath=ctx.obj["vault_file"]
-        )
+        vault = _get_vault(ctx, keys=(key,))
 
         versions = vault.list_versions(key)
 
@@ -256,13 +288,15 @@ def list_versions(ctx: click.Context, key: str) -> None:
             click.echo(f"❌ No versions found for '{key}'")
             sys.exit(1)
 
-        click.echo(f"📋 Version history for '{key}':\n")
+        # Build the whole listing and write it with one echo
+        lines = [f"📋 Version history for '{key}':\n"]
         for v in reversed(versions):  # Show newest first
-            click.echo(f"  Version {v['version']}")
-            click.echo(f"    Timestamp: {v['timestamp']}")
+            lines.append(f"  Version {v['version']}")
+            lines.append(f"    Timestamp: {v['timestamp']}")
             if v.get("metadata"):
-                click.echo(f"    Metadata: {v['metadata']}")
-            click.echo()
+                lines.append(f"    Metadata: {v['metadata']}")
+            lines.append("")
+        click.echo("\n".join(lines))
 
     except MasterKeyNotFoundError as e:
         click.echo(f"❌ {e}", err=True)
@@ -278,10 +312,10 @@ def list_versions(ctx: click.Context, key: str) -> None:
 @click.pass_context
 def audit(ctx: click.Context, key: Optional[str], limit: int) -> None:
     """Display audit log of vault operations."""
+    from .vault import MasterKeyNotFoundError
+
     try:
-        vault = MobileSecretsVault(
-            master_key_file=ctx.obj["master_key_file"], secrets_filepath=ctx.obj["vault_file"]
-        )
+        vault = _get_vault(ctx)
 
         logs = vault.get_audit_log(key=key, limit=limit)
 
@@ -290,18 +324,20 @@ def audit(ctx: click.Context, key: Optional[str], limit: int) -> None:
             return
 
         title = f"Audit log for '{key}'" if key else "Audit log"
-        click.echo(f"📋 {title} (showing {len(logs)} entries):\n")
+        lines = [f"📋 {title} (showing {len(logs)} entries):\n"]
 
         for log in logs:
             status = "✅" if log["success"] else "❌"
             key_info = f" - {log['key']}" if log["key"] else ""
-            click.echo(f"{status} {log['timestamp']} - {log['operation']}{key_info}")
+            lines.append(f"{status} {log['timestamp']} - {log['operation']}{key_info}")
 
             if log.get("error"):
-                click.echo(f"   Error: {log['error']}")
+                lines.append(f"   Error: {log['error']}")
 
             if log.get("metadata"):
-                click.echo(f"   Metadata: {log['metadata']}")
+                lines.append(f"   Metadata: {log['metadata']}")
+
+        click.echo("\n".join(lines))
 
     except MasterKeyNotFoundError as e:
         click.echo(f"❌ {e}", err=True)
@@ -315,21 +351,20 @@ def audit(ctx: click.Context, key: Optional[str], limit: int) -> None:
 @click.pass_context
 def list_keys(ctx: click.Context) -> None:
     """List all secret keys in the vault."""
+    from .vault import MasterKeyNotFoundError
+
     try:
-        vault = MobileSecretsVault(
-            master_key_file=ctx.obj["master_key_file"], secrets_filepath=ctx.obj["vault_file"]
-        )
+        vault = _get_vault(ctx)
 
-        keys = vault.list_keys()
+        counts = vault.list_keys_with_counts()
 
-        if not keys:
+        if not counts:
             click.echo("📋 Vault is empty")
             return
 
-        click.echo(f"📋 Secrets in vault ({len(keys)}):\n")
-        for key in sorted(keys):
-            versions = vault.list_versions(key)
-            click.echo(f"  • {key} ({len(versions)} versions)")
+        lines = [f"📋 Secrets in vault ({len(counts)}):\n"]
+        lines.extend(f"  • {key} ({version_count} versions)" for key, version_count in counts)
+        click.echo("\n".join(lines))
 
     except MasterKeyNotFoundError as e:
         click.echo(f"❌ {e}", err=True)
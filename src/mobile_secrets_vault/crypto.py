@@ -1,13 +1,63 @@
 """
 Cryptography engine for Mobile Secrets Vault.
 
-Implements AES-GCM-256 authenticated encryption for securing secrets.
+Implements AES-GCM-256 authenticated encryption for securing secrets, with
+ChaCha20-Poly1305 used instead on CPUs without AES instructions.
 """
 
 import os
 import base64
-from typing import Dict, Tuple
-from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from functools import lru_cache
+from typing import Dict, List, Mapping, Sequence, Tuple, Type, Union
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+
+# Encrypted value as produced by CryptoEngine.encrypt: raw ciphertext and
+# nonce, plus the name of the algorithm under "alg"
+EncryptedData = Dict[str, Union[bytes, str]]
+
+# Encrypted value accepted by CryptoEngine.decrypt; str fields are the legacy
+# base64-encoded form written by earlier versions
+StoredEncryptedData = Mapping[str, Union[bytes, str]]
+
+# Algorithm names stored under "alg"; values without one are AES-GCM
+ALG_AES_GCM = "AES-GCM"
+ALG_CHACHA20_POLY1305 = "CHACHA20-POLY1305"
+
+Cipher = Union[AESGCM, ChaCha20Poly1305]
+
+_CIPHERS: Dict[str, Type[Cipher]] = {
+    ALG_AES_GCM: AESGCM,
+    ALG_CHACHA20_POLY1305: ChaCha20Poly1305,
+}
+
+
+@lru_cache(maxsize=4)
+def _cipher(alg: str, key: bytes) -> Cipher:
+    """
+    Return the AEAD object for an algorithm and key.
+
+    Cached so repeated operations with the same master key reuse the
+    expanded key schedule; a vault normally uses one or two keys.
+    """
+    return _CIPHERS[alg](key)
+
+
+def _cpu_has_aes() -> bool:
+    """
+    Check whether the CPU advertises AES instructions.
+
+    Reads the x86 "flags" or ARM "Features" line of /proc/cpuinfo. Where
+    that file is unavailable the answer is assumed to be yes.
+    """
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name.strip() in ("flags", "Features"):
+                    return "aes" in value.split()
+    except OSError:
+        pass
+    return True
 
 
 class CryptoEngine:
@@ -23,9 +73,15 @@ class CryptoEngine:
     # AES-256 requires 32-byte keys
     KEY_SIZE = 32  # 256 bits
 
-    # Nonce size for AES-GCM (96 bits is recommended)
+    # Nonce size for AES-GCM and ChaCha20-Poly1305 (96 bits). Nonces are kept
+    # as raw bytes next to each ciphertext (!!binary in the YAML file), and
+    # batches draw all of theirs from one os.urandom call.
     NONCE_SIZE = 12  # 96 bits
 
+    # Algorithm for new encryptions: software AES is much slower than
+    # ChaCha20 on CPUs without AES instructions
+    ALGORITHM = ALG_AES_GCM if _cpu_has_aes() else ALG_CHACHA20_POLY1305
+
     @staticmethod
     def generate_key() -> bytes:
         """
@@ -37,9 +93,9 @@ class CryptoEngine:
         return AESGCM.generate_key(bit_length=256)
 
     @staticmethod
-    def encrypt(plaintext: str, key: bytes) -> Dict[str, str]:
+    def encrypt(plaintext: str, key: bytes) -> EncryptedData:
         """
-        Encrypt plaintext using AES-GCM-256.
+        Encrypt plaintext using CryptoEngine.ALGORITHM.
 
         Args:
             plaintext: The secret value to encrypt
@@ -47,41 +103,30 @@ class CryptoEngine:
 
         Returns:
             Dictionary containing:
-                - ciphertext: Base64-encoded encrypted data
-                - nonce: Base64-encoded nonce (required for decryption)
+                - ciphertext: Encrypted data (raw bytes)
+                - nonce: Nonce required for decryption (raw bytes)
+                - alg: Name of the algorithm used
 
         Raises:
             ValueError: If key is not 32 bytes
         """
-        if len(key) != CryptoEngine.KEY_SIZE:
-            raise ValueError(f"Key must be {CryptoEngine.KEY_SIZE} bytes, got {len(key)}")
+        CryptoEngine._check_key(key)
 
         # Generate a random nonce for this encryption operation
         nonce = os.urandom(CryptoEngine.NONCE_SIZE)
 
-        # Initialize AES-GCM with the key
-        aesgcm = AESGCM(key)
-
-        # Encrypt the plaintext (GCM automatically adds authentication tag)
-        ciphertext = aesgcm.encrypt(
-            nonce=nonce,
-            data=plaintext.encode("utf-8"),
-            associated_data=None,  # Could add metadata here if needed
-        )
-
-        # Return base64-encoded values for safe YAML/JSON storage
-        return {
-            "ciphertext": base64.b64encode(ciphertext).decode("utf-8"),
-            "nonce": base64.b64encode(nonce).decode("utf-8"),
-        }
+        alg = CryptoEngine.ALGORITHM
+        return CryptoEngine._encrypt_with(_cipher(alg, key), alg, plaintext, nonce)
 
     @staticmethod
-    def decrypt(encrypted_data: Dict[str, str], key: bytes) -> str:
+    def decrypt(encrypted_data: StoredEncryptedData, key: bytes) -> str:
         """
-        Decrypt ciphertext using AES-GCM-256.
+        Decrypt ciphertext with the algorithm named in its 'alg' field.
 
         Args:
-            encrypted_data: Dictionary with 'ciphertext' and 'nonce' (base64-encoded)
+            encrypted_data: Dictionary with 'ciphertext' and 'nonce' (raw bytes, or
+                base64-encoded strings as written by earlier versions) and an
+                optional 'alg' (AES-GCM when missing)
             key: 32-byte AES-256 key (must be the same key used for encryption)
 
         Returns:
@@ -91,28 +136,119 @@ class CryptoEngine:
             ValueError: If key is not 32 bytes or data is malformed
             cryptography.exceptions.InvalidTag: If authentication fails (tampering detected)
         """
+        CryptoEngine._check_key(key)
+        alg = CryptoEngine._algorithm_of(encrypted_data)
+        return CryptoEngine._decrypt_with(_cipher(alg, key), encrypted_data)
+
+    @staticmethod
+    def encrypt_batch(plaintexts: Sequence[str], key: bytes) -> List[EncryptedData]:
+        """
+        Encrypt several plaintexts with the same key.
+
+        The key is validated and the cipher is set up once for the whole
+        batch; each value still gets its own random nonce, all
+        drawn from the OS in a single call.
+
+        Args:
+            plaintexts: Secret values to encrypt
+            key: 32-byte AES-256 key
+
+        Returns:
+            List of encrypted dictionaries, in the same order as ``plaintexts``
+
+        Raises:
+            ValueError: If key is not 32 bytes
+        """
+        CryptoEngine._check_key(key)
+        alg = CryptoEngine.ALGORITHM
+        cipher = _cipher(alg, key)
+        nonces = CryptoEngine._draw_nonces(len(plaintexts))
+        return [
+            CryptoEngine._encrypt_with(cipher, alg, plaintext, nonce)
+            for plaintext, nonce in zip(plaintexts, nonces)
+        ]
+
+    @staticmethod
+    def decrypt_batch(items: Sequence[StoredEncryptedData], key: bytes) -> List[str]:
+        """
+        Decrypt several encrypted values with the same key.
+
+        Args:
+            items: Dictionaries with 'ciphertext' and 'nonce'
+            key: 32-byte AES-256 key
+
+        Returns:
+            List of plaintext strings, in the same order as ``items``
+
+        Raises:
+            ValueError: If key is not 32 bytes or any item is malformed
+            cryptography.exceptions.InvalidTag: If authentication fails for any item
+        """
+        CryptoEngine._check_key(key)
+        return [
+            CryptoEngine._decrypt_with(_cipher(CryptoEngine._algorithm_of(item), key), item)
+            for item in items
+        ]
+
+    @staticmethod
+    def _draw_nonces(count: int) -> List[bytes]:
+        """Draw ``count`` random nonces with a single os.urandom call."""
+        size = CryptoEngine.NONCE_SIZE
+        buf = os.urandom(size * count)
+        return [buf[i : i + size] for i in range(0, size * count, size)]
+
+    @staticmethod
+    def _check_key(key: bytes) -> None:
+        """Raise ValueError unless key is a valid AES-256 key."""
         if len(key) != CryptoEngine.KEY_SIZE:
             raise ValueError(f"Key must be {CryptoEngine.KEY_SIZE} bytes, got {len(key)}")
 
+    @staticmethod
+    def _algorithm_of(encrypted_data: StoredEncryptedData) -> str:
+        """Return the algorithm name of an encrypted value, validating it."""
+        alg = encrypted_data.get("alg", ALG_AES_GCM)
+        if alg not in _CIPHERS:
+            raise ValueError(f"Unsupported encryption algorithm: {alg!r}")
+        return str(alg)
+
+    @staticmethod
+    def _encrypt_with(cipher: Cipher, alg: str, plaintext: str, nonce: bytes) -> EncryptedData:
+        """Encrypt one value with a prepared cipher and nonce."""
+        # Encrypt the plaintext (the AEAD automatically adds authentication tag)
+        ciphertext = cipher.encrypt(
+            nonce=nonce,
+            data=plaintext.encode("utf-8"),
+            associated_data=None,  # Could add metadata here if needed
+        )
+
+        # Raw bytes; the YAML storage writes them as !!binary
+        return {"ciphertext": ciphertext, "nonce": nonce, "alg": alg}
+
+    @staticmethod
+    def _decrypt_with(cipher: Cipher, encrypted_data: StoredEncryptedData) -> str:
+        """Decrypt one value with a prepared cipher."""
         if "ciphertext" not in encrypted_data or "nonce" not in encrypted_data:
             raise ValueError("Encrypted data must contain 'ciphertext' and 'nonce'")
 
-        # Decode base64-encoded values
-        try:
-            ciphertext = base64.b64decode(encrypted_data["ciphertext"])
-            nonce = base64.b64decode(encrypted_data["nonce"])
-        except Exception as e:
-            raise ValueError(f"Failed to decode encrypted data: {e}")
-
-        # Initialize AES-GCM with the key
-        aesgcm = AESGCM(key)
+        ciphertext = CryptoEngine._as_bytes(encrypted_data["ciphertext"])
+        nonce = CryptoEngine._as_bytes(encrypted_data["nonce"])
 
         # Decrypt and verify authentication tag
         # This will raise InvalidTag if the data has been tampered with
-        plaintext_bytes = aesgcm.decrypt(nonce=nonce, data=ciphertext, associated_data=None)
+        plaintext_bytes = cipher.decrypt(nonce=nonce, data=ciphertext, associated_data=None)
 
         return plaintext_bytes.decode("utf-8")
 
+    @staticmethod
+    def _as_bytes(value: Union[bytes, str]) -> bytes:
+        """Return raw bytes, decoding legacy base64 strings."""
+        if isinstance(value, bytes):
+            return value
+        try:
+            return base64.b64decode(value)
+        except Exception as e:
+            raise ValueError(f"Failed to decode encrypted data: {e}")
+
     @staticmethod
     def key_to_string(key: bytes) -> str:
         """Convert a key to base64 string for storage."""
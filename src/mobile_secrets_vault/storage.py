@@ -1,15 +1,231 @@
 """
 Storage backend for Mobile Secrets Vault.
 
-Handles reading and writing encrypted secrets to YAML files with file locking.
+Handles reading and writing encrypted secrets to YAML (or, optionally,
+MessagePack) files with file locking.
 """
 
+import base64
+import copy
+import os
+import re
 import yaml
 import shutil
+import stat
+import hashlib
+import mmap
+import struct
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import BinaryIO, Collection, Dict, Any, Iterator, List, Optional, Tuple
 import fcntl
-import tempfile
+import threading
+from collections import OrderedDict
+
+# Prefer the libyaml C extension when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover - depends on the PyYAML build
+    from yaml import SafeDumper, SafeLoader  # type: ignore[assignment]
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is an optional dependency
+    msgpack = None
+
+# File formats; MessagePack is chosen for these suffixes unless given explicitly
+FORMAT_YAML = "yaml"
+FORMAT_MSGPACK = "msgpack"
+_MSGPACK_SUFFIXES = (".mpk", ".msgpack")
+
+# fdatasync skips the metadata flush where the platform supports it
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+# ioctl request number for FICLONE (reflink a whole file on Btrfs/XFS)
+_FICLONE = 0x40049409
+
+# Journal frame header: payload length (little-endian) and a truncated
+# SHA-256 of the payload, which OpenSSL computes with SHA-NI where available
+_FRAME_HEADER = struct.Struct("<I8s")
+
+
+def _apply_stat(path: Path, st: os.stat_result) -> None:
+    """Copy permission bits and timestamps from an existing stat result."""
+    os.chmod(path, stat.S_IMODE(st.st_mode))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+# Scalars that can be written unquoted, if the resolver also reads them as str
+_PLAIN = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_./-]*")
+# Scalars that can be written single-quoted on one line
+_QUOTABLE = re.compile(r"[\x20-\x7e]*")
+_STR_TAG = "tag:yaml.org,2002:str"
+_resolve = yaml.resolver.Resolver().resolve
+
+
+class _SchemaMismatch(Exception):
+    """Data does not have the shape _dump_vault() knows how to write."""
+
+
+def _scalar(value: Any) -> str:
+    """Render a scalar as YAML text, or raise _SchemaMismatch."""
+    kind = type(value)
+    if kind is str:
+        text: str = value
+        if _PLAIN.fullmatch(text) and _resolve(yaml.ScalarNode, text, (True, False)) == _STR_TAG:
+            return text
+        if _QUOTABLE.fullmatch(text):
+            return "'" + text.replace("'", "''") + "'"
+    elif kind is bytes:
+        return '!!binary "' + base64.b64encode(value).decode("ascii") + '"'
+    elif kind is int:
+        return str(value)
+    elif kind is bool:
+        return "true" if value else "false"
+    elif value is None:
+        return "null"
+    raise _SchemaMismatch
+
+
+def _flow(value: Any) -> str:
+    """Render a value in YAML flow style, or raise _SchemaMismatch."""
+    kind = type(value)
+    if kind is dict:
+        return "{" + ", ".join(f"{_scalar(k)}: {_flow(v)}" for k, v in value.items()) + "}"
+    if kind is list:
+        return "[" + ", ".join(_flow(v) for v in value) + "]"
+    return _scalar(value)
+
+
+def _dump_entry(key: Any, entry: Any) -> str:
+    """
+    Write one secret in the layout produced by VersionManager.to_dict().
+
+    Walks the known {versions: [...], current_version: n} structure directly
+    instead of going through the generic representer and emitter. Raises
+    _SchemaMismatch for anything else, including non-ASCII text.
+    """
+    if type(entry) is not dict or entry.keys() != {"versions", "current_version"}:
+        raise _SchemaMismatch
+    versions = entry["versions"]
+    if type(versions) is not list:
+        raise _SchemaMismatch
+
+    out = [f"{_scalar(key)}:\n", "  versions:\n" if versions else "  versions: []\n"]
+    for version in versions:
+        if type(version) is not dict or not version:
+            raise _SchemaMismatch
+        prefix = "  - "
+        for field, value in version.items():
+            out.append(f"{prefix}{_scalar(field)}: {_flow(value)}\n")
+            prefix = "    "
+    out.append(f"  current_version: {_scalar(entry['current_version'])}\n")
+    return "".join(out)
+
+
+def _dump_vault(data: Dict[str, Any]) -> str:
+    """Write secrets data with _dump_entry(), or raise _SchemaMismatch."""
+    return "".join(_dump_entry(key, entry) for key, entry in data.items()) or "{}\n"
+
+
+def _dump_generic(data: Dict[str, Any]) -> bytes:
+    """Serialize arbitrary secrets data to UTF-8 YAML."""
+    return yaml.dump(  # type: ignore[no-any-return]
+        data,
+        Dumper=SafeDumper,
+        default_flow_style=False,
+        sort_keys=False,
+        allow_unicode=True,
+        encoding="utf-8",
+    )
+
+
+def _unpack_file(f: BinaryIO, st: os.stat_result) -> Dict[str, Any]:
+    """Parse an open MessagePack file straight from the page cache."""
+    if st.st_size == 0:
+        return {}
+    # Unpacking from the mapping skips copying the file into a bytes object
+    # Metadata may use non-str keys, which the YAML format also accepts
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        return msgpack.unpackb(buf, strict_map_key=False) or {}
+
+
+def _frame(payload: bytes) -> bytes:
+    """Wrap a journal record in a length and checksum header."""
+    return _FRAME_HEADER.pack(len(payload), _frame_tag(payload)) + payload
+
+
+def _frame_tag(payload: bytes) -> bytes:
+    """Integrity tag of a journal record."""
+    return hashlib.sha256(payload).digest()[:8]
+
+
+def _read_frames(data: bytes) -> Tuple[List[bytes], int]:
+    """
+    Split journal bytes into record payloads.
+
+    Stops at the first incomplete or corrupt frame, which is what a crash
+    during an append leaves behind.
+
+    Returns:
+        The payloads, and the length of the valid prefix of data
+    """
+    frames = []
+    offset = 0
+    header_size = _FRAME_HEADER.size
+    while offset + header_size <= len(data):
+        length, tag = _FRAME_HEADER.unpack_from(data, offset)
+        end = offset + header_size + length
+        payload = data[offset + header_size : end]
+        if end > len(data) or _frame_tag(payload) != tag:
+            break
+        frames.append(payload)
+        offset = end
+    return frames, offset
+
+
+def _journal_base(st: os.stat_result) -> bytes:
+    """First journal record: identifies the secrets file the journal amends."""
+    return b"base %d %d %d" % (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _signature(st: os.stat_result, journal_st: Optional[os.stat_result]) -> Tuple[int, ...]:
+    """
+    Load cache key for a secrets file and its journal, if any.
+
+    Includes the inode so that a same-size file renamed into place within
+    one timestamp tick is not mistaken for the cached one.
+    """
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if journal_st is None:
+        return key
+    return key + (journal_st.st_ino, journal_st.st_mtime_ns, journal_st.st_size)
+
+
+def _apply_changes(data: Dict[str, Any], changes: Dict[str, Any]) -> None:
+    """Apply journal changes to loaded data; None entries are deletions."""
+    for key, entry in changes.items():
+        if entry is None:
+            data.pop(key, None)
+        else:
+            data[key] = entry
+
+
+def _construct_entries(
+    loader: SafeLoader, node: Optional[yaml.Node], keys: Collection[str]
+) -> Dict[str, Any]:
+    """Construct the entries of a top-level mapping node whose key is in keys."""
+    if node is None:
+        return {}
+    if not isinstance(node, yaml.MappingNode):
+        raise yaml.YAMLError("Secrets file must contain a mapping")
+
+    data = {}
+    for key_node, value_node in node.value:
+        key = loader.construct_object(key_node, deep=True)
+        if key in keys:
+            data[key] = loader.construct_object(value_node, deep=True)
+    return data
 
 
 class StorageBackend:
@@ -20,21 +236,87 @@ class StorageBackend:
     - Safe file operations with atomic writes
     - Automatic backups before modifications
     - File locking to prevent concurrent writes
+    - Process-wide LRU cache of parsed files, keyed by mtime and size
+    - Optional append-only journal, so small updates do not rewrite the file
+
+    With journaling enabled, a save appends the changed entries to
+    ``<file>.journal`` as checksummed records. The journal starts with the
+    inode, mtime and size of the secrets file it amends, so it is ignored
+    once that file is replaced. Once the journal would grow past twice the
+    size of the file, the next save rewrites the file and drops the journal.
     """
 
-    def __init__(self, filepath: Path):
+    # Parsed file contents: {absolute path: (signature, data)}, least
+    # recently used first; see _signature()
+    _cache: "OrderedDict[str, Tuple[Tuple[int, ...], Dict[str, Any]]]" = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    # Number of files kept in the cache
+    CACHE_MAX_ENTRIES = 100
+
+    def __init__(self, filepath: Path, format: Optional[str] = None, journal: bool = False):
         """
         Initialize storage backend.
 
         Args:
             filepath: Path to the secrets file
+            format: FORMAT_YAML or FORMAT_MSGPACK; by default MessagePack is
+                used for .mpk/.msgpack files and YAML for everything else
+            journal: Append changed entries to a journal instead of rewriting
+                the file on every save (YAML format only)
+
+        Raises:
+            ValueError: If the format is unknown
+            ImportError: If MessagePack is requested but msgpack is not installed
         """
         self.filepath = Path(filepath)
+        if format is None:
+            is_msgpack = self.filepath.suffix.lower() in _MSGPACK_SUFFIXES
+            format = FORMAT_MSGPACK if is_msgpack else FORMAT_YAML
+        if format not in (FORMAT_YAML, FORMAT_MSGPACK):
+            raise ValueError(f"Unsupported storage format: {format!r}")
+        if format == FORMAT_MSGPACK and msgpack is None:
+            raise ImportError(
+                "MessagePack storage requires msgpack: "
+                'pip install "mobile-secrets-vault[msgpack]"'
+            )
+        self.format = format
+        self._cache_key = os.path.abspath(self.filepath)
+        self._backup_path = self.filepath.with_suffix(self.filepath.suffix + ".backup")
+        self._lock_path = self.filepath.with_name(self.filepath.name + ".lock")
+        self._journal_path = self.filepath.with_name(self.filepath.name + ".journal")
+        self.journal = journal
+        # Per-key YAML text and private copy from the last save: {key: (text, entry)}
+        self._fragments: Dict[Any, Tuple[str, Any]] = {}
+        # (base record, size, mtime_ns) of the journal after our last append
+        self._journal_end: Optional[Tuple[bytes, int, int]] = None
 
-    def load(self) -> Dict[str, Any]:
+    def _cache_get(self, signature: Tuple[int, ...]) -> Optional[Dict[str, Any]]:
+        """Return the cached data for this file if it matches signature, else None."""
+        with self._cache_lock:
+            cached = self._cache.get(self._cache_key)
+            if cached is None or cached[0] != signature:
+                return None
+            self._cache.move_to_end(self._cache_key)
+            return cached[1]
+
+    def _cache_put(self, signature: Tuple[int, ...], data: Dict[str, Any]) -> None:
+        """Cache a private copy of this file's data, evicting the oldest file."""
+        with self._cache_lock:
+            self._cache[self._cache_key] = (signature, data)
+            self._cache.move_to_end(self._cache_key)
+            if len(self._cache) > self.CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+
+    def load(self, shared: bool = False) -> Dict[str, Any]:
         """
         Load secrets from file.
 
+        Args:
+            shared: Return the parsed data kept for later loads of the same
+                file contents instead of a private copy. The caller must not
+                modify any part of it.
+
         Returns:
             Dictionary containing secrets data, or empty dict if file doesn't exist
 
@@ -46,62 +328,344 @@ class StorageBackend:
             return {}
 
         try:
-            with open(self.filepath, "r") as f:
+            with self._reader_lock(), open(self.filepath, "rb") as f:
                 # Acquire shared lock for reading
                 fcntl.flock(f.fileno(), fcntl.LOCK_SH)
                 try:
-                    data = yaml.safe_load(f) or {}
+                    # Reuse the parsed data if the file and journal are unchanged
+                    st = os.fstat(f.fileno())
+                    journal_st = self._journal_stat()
+                    signature = _signature(st, journal_st)
+                    cached = self._cache_get(signature)
+                    if cached is not None:
+                        return cached if shared else copy.deepcopy(cached)
+
+                    if self.format == FORMAT_MSGPACK:
+                        data = _unpack_file(f, st)
+                    else:
+                        data = yaml.load(f, Loader=SafeLoader) or {}
+                    if journal_st is not None:
+                        _apply_changes(data, self._journal_changes(st))
                 finally:
                     fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            self._cache_put(signature, data if shared else copy.deepcopy(data))
             return data
         except yaml.YAMLError as e:
             raise yaml.YAMLError(f"Failed to parse secrets file: {e}")
         except Exception as e:
             raise IOError(f"Failed to read secrets file: {e}")
 
-    def save(self, data: Dict[str, Any], create_backup: bool = True) -> None:
+    def load_partial(self, keys: Collection[str]) -> Dict[str, Any]:
+        """
+        Load only the given top-level secrets from file.
+
+        The whole document is still parsed, but Python objects are only
+        constructed for the requested entries; the versions of every other
+        secret stay as parser nodes and are discarded.
+
+        Args:
+            keys: Secret keys to load
+
+        Returns:
+            Dictionary with those of the requested secrets that exist
+
+        Raises:
+            yaml.YAMLError: If file contains invalid YAML
+            IOError: If file cannot be read
+        """
+        if not self.filepath.exists():
+            return {}
+
+        try:
+            with self._reader_lock(), open(self.filepath, "rb") as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+                try:
+                    # A fresh full load already has everything
+                    st = os.fstat(f.fileno())
+                    journal_st = self._journal_stat()
+                    cached = self._cache_get(_signature(st, journal_st))
+                    if cached is not None:
+                        return {
+                            key: copy.deepcopy(value)
+                            for key, value in cached.items()
+                            if key in keys
+                        }
+
+                    if self.format == FORMAT_MSGPACK:
+                        # MessagePack has no cheap way to skip subtrees
+                        data = _unpack_file(f, st)
+                        return {key: value for key, value in data.items() if key in keys}
+
+                    loader = SafeLoader(f)
+                    try:
+                        data = _construct_entries(loader, loader.get_single_node(), keys)
+                    finally:
+                        loader.dispose()
+                    if journal_st is not None:
+                        _apply_changes(data, self._journal_changes(st, keys))
+                    return data
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        except yaml.YAMLError as e:
+            raise yaml.YAMLError(f"Failed to parse secrets file: {e}")
+        except Exception as e:
+            raise IOError(f"Failed to read secrets file: {e}")
+
+    @contextmanager
+    def _reader_lock(self) -> Iterator[None]:
+        """
+        Hold the writers' lock shared while a journal exists.
+
+        The secrets file and its journal are then read as a pair, without a
+        compaction replacing the file between the two reads.
+        """
+        if not os.path.exists(self._journal_path):
+            yield
+            return
+        try:
+            lock_fd = os.open(self._lock_path, os.O_RDONLY)
+        except FileNotFoundError:
+            yield
+            return
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(lock_fd)
+
+    def _journal_stat(self) -> Optional[os.stat_result]:
+        """Stat the journal file, or return None if there is none."""
+        try:
+            return os.stat(self._journal_path)
+        except FileNotFoundError:
+            return None
+
+    def _journal_changes(
+        self, st: os.stat_result, keys: Optional[Collection[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Read the journal entries that amend the secrets file described by st.
+
+        Args:
+            st: fstat of the opened secrets file
+            keys: Only construct these entries (None for all)
+
+        Returns:
+            {key: entry} with None for deleted keys, latest record winning
+        """
+        try:
+            with open(self._journal_path, "rb") as f:
+                frames, _ = _read_frames(f.read())
+        except FileNotFoundError:
+            return {}
+        if not frames or frames[0] != _journal_base(st):
+            # Left over from a file that has since been replaced
+            return {}
+
+        changes: Dict[str, Any] = {}
+        for payload in frames[1:]:
+            if keys is None:
+                changes.update(yaml.load(payload, Loader=SafeLoader))
+                continue
+            loader = SafeLoader(payload)
+            try:
+                changes.update(_construct_entries(loader, loader.get_single_node(), keys))
+            finally:
+                loader.dispose()
+        return changes
+
+    def _remove_journal(self) -> None:
+        """Delete the journal file if there is one."""
+        self._journal_end = None
+        try:
+            os.unlink(self._journal_path)
+        except FileNotFoundError:
+            pass
+
+    def save(
+        self,
+        data: Dict[str, Any],
+        create_backup: bool = True,
+        changed: Optional[Collection[str]] = None,
+    ) -> None:
         """
         Save secrets to file atomically.
 
         Uses atomic write pattern:
-        1. Write to temporary file
+        1. Write to temporary file and flush it to disk
         2. Create backup if requested
-        3. Atomically replace original file
+        3. Atomically replace original file and sync the directory entry
+
+        Entries that did not change since the previous save through this
+        backend reuse their rendered YAML instead of being serialized again.
+        With journaling enabled and ``changed`` given, only those entries are
+        appended to the journal; no backup is made for such appends.
 
         Args:
             data: Secrets data to save
             create_backup: Whether to create a backup before writing
+            changed: Keys whose entries may differ from the previous save
+                through this backend (None if any entry may have changed)
 
         Raises:
             IOError: If file cannot be written
         """
-        # Ensure parent directory exists
-        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        # Serialize writers on a sidecar lock file for backup, write and rename
+        try:
+            lock_fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        except FileNotFoundError:
+            # Parent directory is missing; create it only on this slow path
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+            lock_fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+
+            # One lstat tells whether there is anything to back up
+            try:
+                src_stat: Optional[os.stat_result] = os.lstat(self.filepath)
+            except FileNotFoundError:
+                src_stat = None
+
+            if self.journal and changed is not None and src_stat is not None:
+                if self._append_journal(data, changed):
+                    return
+
+            if create_backup and src_stat is not None:
+                self._create_backup(src_stat)
+
+            self._write_and_replace(data, changed)
+        finally:
+            fcntl.flock(lock_fd, fcntl.LOCK_UN)
+            os.close(lock_fd)
+
+    def _render(
+        self, data: Dict[str, Any], changed: Optional[Collection[str]]
+    ) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Serialize data, re-rendering only entries that changed.
 
-        # Create backup if file exists and backup is requested
-        if create_backup and self.filepath.exists():
-            self._create_backup()
+        Returns:
+            The file content, and a private copy of data for the load cache
+        """
+        if self.format == FORMAT_MSGPACK:
+            return msgpack.packb(data, use_bin_type=True), copy.deepcopy(data)
 
-        # Write to temporary file first (atomic operation)
+        try:
+            snapshot = self._update_fragments(data, changed)
+        except _SchemaMismatch:
+            self._fragments = {}
+            return _dump_generic(data), copy.deepcopy(data)
+
+        text = "".join(text for text, _ in self._fragments.values()) or "{}\n"
+        return text.encode("ascii"), snapshot
+
+    def _update_fragments(
+        self, data: Dict[str, Any], changed: Optional[Collection[str]]
+    ) -> Dict[str, Any]:
+        """
+        Re-render the YAML of changed entries, keeping the rest.
+
+        Returns:
+            A private copy of data for the load cache
+
+        Raises:
+            _SchemaMismatch: If an entry is outside the fast path's schema
+        """
+        previous = self._fragments
+        if changed is None:
+            previous, changed = {}, ()
+
+        fragments = {}
+        for key, entry in data.items():
+            fragment = previous.get(key)
+            if fragment is None or key in changed:
+                fragment = (_dump_entry(key, entry), copy.deepcopy(entry))
+            fragments[key] = fragment
+
+        self._fragments = fragments
+        return {key: entry for key, (_, entry) in fragments.items()}
+
+    def _append_journal(self, data: Dict[str, Any], changed: Collection[str]) -> bool:
+        """
+        Record the changed entries by appending them to the journal.
+
+        Returns:
+            False if the secrets file should be rewritten instead: the format
+            has no journal, an entry is outside the fast path's schema, or
+            the journal has outgrown the file it amends
+        """
+        if self.format != FORMAT_YAML:
+            return False
+        try:
+            snapshot = self._update_fragments(data, changed)
+            payloads = [
+                (
+                    self._fragments[key][0] if key in self._fragments else f"{_scalar(key)}: null\n"
+                ).encode("ascii")
+                for key in changed
+            ]
+        except _SchemaMismatch:
+            return False
+
+        st = os.stat(self.filepath)
+        base = _journal_base(st)
+        fd = os.open(self._journal_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            journal_st = os.fstat(fd)
+            if journal_st.st_size + sum(map(len, payloads)) > 2 * st.st_size:
+                return False
+
+            valid = journal_st.st_size
+            if (base, journal_st.st_size, journal_st.st_mtime_ns) != self._journal_end:
+                # Changed since our last append: keep only complete records
+                # that amend the current secrets file
+                frames, valid = _read_frames(os.pread(fd, journal_st.st_size, 0))
+                if not frames or frames[0] != base:
+                    valid = 0
+                if valid != journal_st.st_size:
+                    os.ftruncate(fd, valid)
+
+            buf = b"".join(map(_frame, payloads if valid else [base, *payloads]))
+            view = memoryview(buf)
+            while view:
+                view = view[os.write(fd, view) :]
+            _fdatasync(fd)
+            journal_st = os.fstat(fd)
+        finally:
+            os.close(fd)
+
+        self._journal_end = (base, journal_st.st_size, journal_st.st_mtime_ns)
+        self._cache_put(_signature(st, journal_st), snapshot)
+        return True
+
+    def _write_and_replace(self, data: Dict[str, Any], changed: Optional[Collection[str]]) -> None:
+        """Write data to a private temporary file and rename it over the secrets file."""
         temp_file = None
         try:
-            # Create temp file in same directory to ensure same filesystem
-            with tempfile.NamedTemporaryFile(
-                mode="w", dir=self.filepath.parent, delete=False, suffix=".tmp"
-            ) as f:
-                temp_file = Path(f.name)
+            # Create temp file in same directory to ensure same filesystem;
+            # the name is unique per process and thread, so it needs no lock
+            temp_file = self.filepath.with_name(
+                f"{self.filepath.name}.tmp.{os.getpid()}.{threading.get_ident()}"
+            )
+            # Serialize to one UTF-8 buffer and hand it to the kernel in one write
+            buf, snapshot = self._render(data, changed)
+            fd = self._open_temp(temp_file)
+            try:
+                view = memoryview(buf)
+                while view:
+                    view = view[os.write(fd, view) :]
+                _fdatasync(fd)
+                # The rename keeps mtime and size, so this stat keys the cache
+                st = os.fstat(fd)
+            finally:
+                os.close(fd)
 
-                # Acquire exclusive lock
-                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
-                try:
-                    yaml.safe_dump(
-                        data, f, default_flow_style=False, sort_keys=False, allow_unicode=True
-                    )
-                finally:
-                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            # Atomically replace the original file; a journal amended the old one
+            os.replace(temp_file, self.filepath)
+            self._sync_directory()
+            self._remove_journal()
 
-            # Atomically replace the original file
-            temp_file.replace(self.filepath)
+            self._cache_put(_signature(st, None), snapshot)
 
         except Exception as e:
             # Clean up temp file if something went wrong
@@ -109,15 +673,68 @@ class StorageBackend:
                 temp_file.unlink()
             raise IOError(f"Failed to save secrets file: {e}")
 
-    def _create_backup(self) -> None:
-        """Create a backup of the current secrets file."""
-        backup_path = self.filepath.with_suffix(self.filepath.suffix + ".backup")
+    @staticmethod
+    def _open_temp(temp_file: Path) -> int:
+        """Create a temporary file readable only by the owner."""
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
         try:
-            shutil.copy2(self.filepath, backup_path)
+            return os.open(temp_file, flags, 0o600)
+        except FileExistsError:
+            # Left over by a crashed earlier process with the same pid
+            os.unlink(temp_file)
+            return os.open(temp_file, flags, 0o600)
+
+    def _sync_directory(self) -> None:
+        """Flush the directory entry so the rename survives a crash."""
+        try:
+            dir_fd = os.open(self.filepath.parent, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+
+    def _create_backup(self, src_stat: os.stat_result) -> None:
+        """
+        Create a backup of the current secrets file.
+
+        save() replaces the secrets file with a new inode, so a hard link
+        to the current inode preserves its content without copying bytes.
+        Falls back to a reflink clone, then to a full copy.
+
+        Args:
+            src_stat: lstat result of the secrets file, taken by save()
+        """
+        backup_path = self._backup_path
+        try:
+            try:
+                backup_path.unlink()
+            except FileNotFoundError:
+                pass
+            try:
+                os.link(self.filepath, backup_path)
+            except OSError:
+                if not self._clone_file(self.filepath, backup_path):
+                    shutil.copyfile(self.filepath, backup_path)
+                # A separate inode needs the original's mode and times
+                _apply_stat(backup_path, src_stat)
         except Exception:
             # If backup fails, continue anyway (not critical)
             pass
 
+    @staticmethod
+    def _clone_file(src: Path, dst: Path) -> bool:
+        """Try to reflink src to dst (Linux FICLONE); return True on success."""
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return True
+        except OSError:
+            return False
+
     def delete(self) -> bool:
         """
         Delete the secrets file.
@@ -125,6 +742,8 @@ class StorageBackend:
         Returns:
             True if file was deleted, False if it didn't exist
         """
+        self._cache.pop(self._cache_key, None)
+        self._remove_journal()
         if self.filepath.exists():
             self.filepath.unlink()
             return True
@@ -141,8 +760,7 @@ class StorageBackend:
         Returns:
             Path to backup file, or None if no backup exists
         """
-        backup_path = self.filepath.with_suffix(self.filepath.suffix + ".backup")
-        return backup_path if backup_path.exists() else None
+        return self._backup_path if self._backup_path.exists() else None
 
     def restore_from_backup(self) -> bool:
         """
@@ -153,6 +771,11 @@ class StorageBackend:
         """
         backup_path = self.get_backup_path()
         if backup_path:
+            self._cache.pop(self._cache_key, None)
+            self._remove_journal()
+            if self.filepath.exists() and os.path.samefile(backup_path, self.filepath):
+                # The backup is still a hard link to the current file
+                return True
             shutil.copy2(backup_path, self.filepath)
             return True
         return False
@@ -5,13 +5,41 @@ A secure secrets management library for mobile backend applications.
 """
 
 import os
+import threading
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Collection, Optional, List, Dict, Any, Tuple
+
+import yaml
 
 from .crypto import CryptoEngine
 from .storage import StorageBackend
 from .versioning import VersionManager
-from .audit import AuditLogger, Operation
+from .audit import AuditLogger, NullAuditLogger, Operation
+
+# Length of a base64-encoded master key (with padding)
+_ENCODED_KEY_LENGTH = 4 * ((CryptoEngine.KEY_SIZE + 2) // 3)
+
+
+@lru_cache(maxsize=8)
+def _read_key_file(path: str, ino: int, mtime_ns: int, size: int) -> bytes:
+    """
+    Read a master key file; the stat fields in the cache key catch rewrites.
+
+    Cached key bytes stay in process memory for the life of the process (up
+    to the last 8 files read), which is no longer than a vault holding the
+    key would keep it. Call ``_read_key_file.cache_clear()`` to drop them.
+    """
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _load_key_file(path: Path) -> bytes:
+    """Read a master key file, reusing the bytes while the file is unchanged."""
+    st = os.stat(path)
+    return _read_key_file(os.path.abspath(path), st.st_ino, st.st_mtime_ns, st.st_size)
 
 
 class VaultError(Exception):
@@ -59,6 +87,12 @@ class MobileSecretsVault:
         secrets_filepath: Optional[str] = None,
         audit_log_file: Optional[str] = None,
         auto_save: bool = True,
+        keys: Optional[Collection[str]] = None,
+        plaintext_cache_size: int = 0,
+        journal: bool = False,
+        in_memory: bool = False,
+        audit: bool = True,
+        secrets_format: Optional[str] = None,
     ):
         """
         Initialize the vault.
@@ -71,18 +105,41 @@ class MobileSecretsVault:
             secrets_filepath: Path to encrypted secrets file
             audit_log_file: Path to audit log file (optional)
             auto_save: Automatically save after modifications
+            keys: Load only these secrets. The vault is then read-only,
+                since saving it would drop every other secret.
+            plaintext_cache_size: Number of decrypted values to keep in memory
+                for repeated get() calls (0 disables the cache). Cached
+                plaintexts stay in process memory until evicted or invalidated.
+            journal: Append changed secrets to a journal next to the secrets
+                file instead of rewriting the whole file on every save.
+            in_memory: Keep secrets only in memory; secrets_filepath is
+                neither read nor written and save() only flushes the audit log.
+            audit: Record operations in the audit log; when False, entries
+                are discarded and get_audit_log() returns nothing.
+            secrets_format: Storage format of the secrets file, "yaml" or
+                "msgpack" (default: MessagePack for .mpk/.msgpack paths,
+                YAML otherwise). MessagePack requires the msgpack extra.
 
         Raises:
             MasterKeyNotFoundError: If master key cannot be located
+            ValueError: If secrets_format is unknown
+            ImportError: If MessagePack is requested but msgpack is not installed
         """
         self.auto_save = auto_save
+        self.in_memory = in_memory
+        self._keys = keys
+
+        # Opt-in LRU of decrypted values: {(key, version): plaintext}
+        self._plaintext_cache_size = plaintext_cache_size
+        self._plaintext_cache: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        self._plaintext_lock = threading.Lock()
 
         # Load master key with priority
         self.master_key = self._load_master_key(master_key, master_key_file)
 
         # Initialize storage
         self.secrets_filepath = Path(secrets_filepath or ".vault/secrets.yaml")
-        self.storage = StorageBackend(self.secrets_filepath)
+        self.storage = StorageBackend(self.secrets_filepath, format=secrets_format, journal=journal)
 
         # Initialize components
         self.crypto = CryptoEngine()
@@ -90,10 +147,20 @@ class MobileSecretsVault:
 
         # Initialize audit logger
         audit_path = Path(audit_log_file) if audit_log_file else None
-        self.audit_logger = AuditLogger(log_file=audit_path)
+        self.audit_logger: AuditLogger
+        if not audit:
+            self.audit_logger = NullAuditLogger()
+        else:
+            # Entries are written in batches; a partial batch goes out within 50 ms
+            self.audit_logger = AuditLogger(
+                log_file=audit_path, batch_size=64, flush_interval_ms=50
+            )
+        # Write out the last partial batch when the vault goes away
+        self._finalizer = weakref.finalize(self, self.audit_logger.close)
 
         # Load existing secrets
-        self._load_secrets()
+        if not in_memory:
+            self._load_secrets()
 
         # Log initialization
         self.audit_logger.log(Operation.INIT, success=True)
@@ -109,20 +176,20 @@ class MobileSecretsVault:
             return direct_key
 
         # 2. Environment variable
+        # (values of any other length cannot hold a key, so they fall through)
         env_key = os.environ.get("VAULT_MASTER_KEY")
-        if env_key:
+        if env_key and len(env_key) == _ENCODED_KEY_LENGTH:
             try:
                 return CryptoEngine.string_to_key(env_key)
-            except Exception:
-                pass  # Fall through to next option
+            except ValueError:
+                pass  # Not base64; fall through to next option
 
         # 3. Key file
         if key_file:
             key_path = Path(key_file)
             if key_path.exists():
                 try:
-                    with open(key_path, "rb") as f:
-                        return f.read()
+                    return _load_key_file(key_path)
                 except Exception as e:
                     raise MasterKeyNotFoundError(f"Failed to read key file: {e}")
 
@@ -130,8 +197,7 @@ class MobileSecretsVault:
         default_key_path = Path.home() / ".vault" / "master.key"
         if default_key_path.exists():
             try:
-                with open(default_key_path, "rb") as f:
-                    return f.read()
+                return _load_key_file(default_key_path)
             except Exception:
                 pass
 
@@ -144,12 +210,25 @@ class MobileSecretsVault:
         )
 
     def _load_secrets(self) -> None:
-        """Load secrets from storage."""
+        """
+        Load secrets from storage.
+
+        A missing file loads as empty without raising. An unreadable or
+        malformed file is reported and the vault starts empty; other errors
+        propagate.
+        """
         try:
-            data = self.storage.load()
+            if self._keys is None:
+                # Reopening an unchanged file reuses its parsed data, and
+                # versions are only built for the secrets that are read
+                data = self.storage.load(shared=True)
+            else:
+                data = self.storage.load_partial(self._keys)
             if data:
-                self.version_manager.from_dict(data)
-        except Exception as e:
+                self.version_manager = VersionManager.from_dict_fast(data)
+                # The file already holds everything just loaded
+                self.version_manager.mark_saved(set(data))
+        except (yaml.YAMLError, OSError, KeyError, TypeError, AttributeError, ValueError) as e:
             # If loading fails, start with empty vault
             print(f"Warning: Failed to load secrets: {e}")
 
@@ -173,6 +252,7 @@ class MobileSecretsVault:
 
             # Add new version
             version = self.version_manager.add_version(key, encrypted, metadata)
+            self._invalidate_plaintexts(key)
 
             # Auto-save if enabled
             if self.auto_save:
@@ -187,6 +267,44 @@ class MobileSecretsVault:
             self.audit_logger.log(Operation.SET, key=key, success=False, error=str(e))
             raise VaultError(f"Failed to set secret: {e}")
 
+    def set_many(
+        self, items: Dict[str, str], metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, int]:
+        """
+        Set or update several secrets at once.
+
+        The values are encrypted as one batch and, with auto-save enabled,
+        written with a single save instead of one per secret.
+
+        Args:
+            items: Secret values (plaintext) by key name
+            metadata: Optional metadata for every new version
+
+        Returns:
+            Version number of each new secret
+        """
+        try:
+            keys = list(items)
+            encrypted = self.crypto.encrypt_batch([items[key] for key in keys], self.master_key)
+            versions = self.version_manager.add_versions_bulk(
+                {key: [value] for key, value in zip(keys, encrypted)}, metadata
+            )
+            for key in keys:
+                self._invalidate_plaintexts(key)
+
+            if self.auto_save:
+                self.save()
+
+            for key, version in versions.items():
+                self.audit_logger.log(Operation.SET, key=key, success=True, version=version)
+
+            return versions
+
+        except Exception as e:
+            for key in items:
+                self.audit_logger.log(Operation.SET, key=key, success=False, error=str(e))
+            raise VaultError(f"Failed to set secrets: {e}")
+
     def get(self, key: str, version: Optional[int] = None) -> str:
         """
         Get a secret value.
@@ -198,6 +316,22 @@ class MobileSecretsVault:
         Returns:
             Decrypted secret value
 
+        Raises:
+            SecretNotFoundError: If secret doesn't exist
+        """
+        return self.get_with_version(key, version)[0]
+
+    def get_with_version(self, key: str, version: Optional[int] = None) -> Tuple[str, int]:
+        """
+        Get a secret value together with its version number.
+
+        Args:
+            key: Secret key name
+            version: Specific version to retrieve (None for latest)
+
+        Returns:
+            Tuple of (decrypted secret value, version number)
+
         Raises:
             SecretNotFoundError: If secret doesn't exist
         """
@@ -208,15 +342,18 @@ class MobileSecretsVault:
             if secret_version is None:
                 raise SecretNotFoundError(f"Secret '{key}' not found")
 
-            # Decrypt the value
-            plaintext = self.crypto.decrypt(secret_version.encrypted_value, self.master_key)
+            # Decrypt the value, unless it is cached
+            plaintext = self._cached_plaintext(key, secret_version.version)
+            if plaintext is None:
+                plaintext = self.crypto.decrypt(secret_version.encrypted_value, self.master_key)
+                self._cache_plaintext(key, secret_version.version, plaintext)
 
             # Log operation
             self.audit_logger.log(
                 Operation.GET, key=key, success=True, version=secret_version.version
             )
 
-            return plaintext
+            return plaintext, secret_version.version
 
         except SecretNotFoundError:
             self.audit_logger.log(Operation.GET, key=key, success=False, error="Secret not found")
@@ -225,6 +362,36 @@ class MobileSecretsVault:
             self.audit_logger.log(Operation.GET, key=key, success=False, error=str(e))
             raise VaultError(f"Failed to get secret: {e}")
 
+    def _cached_plaintext(self, key: str, version: int) -> Optional[str]:
+        """Return a cached plaintext and mark it recently used."""
+        if not self._plaintext_cache_size:
+            return None
+        with self._plaintext_lock:
+            plaintext = self._plaintext_cache.get((key, version))
+            if plaintext is not None:
+                self._plaintext_cache.move_to_end((key, version))
+            return plaintext
+
+    def _cache_plaintext(self, key: str, version: int, plaintext: str) -> None:
+        """Add a plaintext to the cache, evicting the least recently used."""
+        if not self._plaintext_cache_size:
+            return
+        with self._plaintext_lock:
+            self._plaintext_cache[(key, version)] = plaintext
+            if len(self._plaintext_cache) > self._plaintext_cache_size:
+                self._plaintext_cache.popitem(last=False)
+
+    def _invalidate_plaintexts(self, key: Optional[str] = None) -> None:
+        """Drop cached plaintexts for one key, or all of them."""
+        if not self._plaintext_cache:
+            return
+        with self._plaintext_lock:
+            if key is None:
+                self._plaintext_cache.clear()
+            else:
+                for cached in [k for k in self._plaintext_cache if k[0] == key]:
+                    del self._plaintext_cache[cached]
+
     def delete(self, key: str) -> bool:
         """
         Delete a secret and all its versions.
@@ -237,6 +404,8 @@ class MobileSecretsVault:
         """
         try:
             deleted = self.version_manager.delete_key(key)
+            # Version numbers restart if the key is set again
+            self._invalidate_plaintexts(key)
 
             if deleted and self.auto_save:
                 self.save()
@@ -272,6 +441,7 @@ class MobileSecretsVault:
             # Re-encrypt all secrets
             old_key = self.master_key
             self.version_manager.rotate_key(old_key, new_key, self.crypto)
+            self._invalidate_plaintexts()
 
             # Update master key
             self.master_key = new_key
@@ -283,6 +453,7 @@ class MobileSecretsVault:
             self.audit_logger.log(
                 Operation.ROTATE,
                 success=True,
+                sync=True,
                 secret_count=len(self.version_manager.get_all_keys()),
             )
 
@@ -320,20 +491,68 @@ class MobileSecretsVault:
         Get list of all secret keys.
 
         Returns:
-            List of secret key names
+            List of secret key names, in the order they were first added
         """
         return self.version_manager.get_all_keys()
 
+    def list_keys_with_counts(self) -> List[Tuple[str, int]]:
+        """
+        Get all secret keys with their version counts, sorted by key.
+
+        Reads only the in-memory version lists; nothing is decrypted.
+
+        Returns:
+            List of (key, version count) tuples
+        """
+        return sorted(self.version_manager.version_counts())
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Check whether a secret exists without decrypting it.
+
+        Args:
+            key: Secret key name
+
+        Returns:
+            True if the secret has at least one version
+        """
+        return key in self.version_manager
+
     def save(self) -> None:
-        """Persist secrets to storage."""
-        data = self.version_manager.to_dict()
-        self.storage.save(data)
+        """
+        Persist secrets to storage and flush buffered audit entries.
+
+        In-memory vaults only flush the audit log.
+
+        Raises:
+            VaultError: If the vault was opened with a subset of keys
+        """
+        if self._keys is not None:
+            raise VaultError("Vault was opened with a subset of keys and is read-only")
+        if not self.in_memory:
+            data = self.version_manager.to_dict()
+            changed = self.version_manager.unsaved_keys()
+            self.storage.save(data, changed=changed)
+            self.version_manager.mark_saved(changed)
+        self.audit_logger.flush()
+
+    def close(self) -> None:
+        """
+        Write buffered audit entries and close the audit log file.
+
+        Called automatically when the vault is garbage collected; secrets
+        are not saved.
+        """
+        self._finalizer()
 
     def get_audit_log(
         self, key: Optional[str] = None, limit: Optional[int] = 100
     ) -> List[Dict[str, Any]]:
         """
-        Retrieve audit logs.
+        Retrieve audit logs, most recent first.
+
+        Filtering by key reads the audit logger's per-key index, so the cost
+        grows with ``limit`` rather than with the total number of entries.
 
         Args:
             key: Filter by specific key (None for all)
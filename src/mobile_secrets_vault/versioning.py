@@ -4,17 +4,30 @@ Versioning system for Mobile Secrets Vault.
 Manages multiple versions of secrets with metadata and history tracking.
 """
 
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+import binascii
+import copy
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Set, Tuple
+
+from ._clock import iso_utc_now
+
+# Versions re-encrypted per worker task during key rotation; smaller vaults
+# are rotated on the calling thread
+_ROTATE_CHUNK = 256
 
 
 class SecretVersion:
     """Represents a single version of a secret."""
 
+    # One instance per stored version is created on every load
+    __slots__ = ("version", "encrypted_value", "timestamp", "metadata")
+
     def __init__(
         self,
         version: int,
-        encrypted_value: Dict[str, str],
+        encrypted_value: Dict[str, Any],
         timestamp: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
     ):
@@ -29,7 +42,7 @@ class SecretVersion:
         """
         self.version = version
         self.encrypted_value = encrypted_value
-        self.timestamp = timestamp or datetime.utcnow().isoformat() + "Z"
+        self.timestamp = timestamp or iso_utc_now()
         self.metadata = metadata or {}
 
     def to_dict(self) -> Dict[str, Any]:
@@ -43,13 +56,40 @@ class SecretVersion:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "SecretVersion":
-        """Create from dictionary."""
-        return cls(
-            version=data["version"],
-            encrypted_value=data["encrypted_value"],
-            timestamp=data.get("timestamp"),
-            metadata=data.get("metadata", {}),
-        )
+        """
+        Create from dictionary.
+
+        Sets the slots directly rather than going through __init__, which
+        roughly halves the cost of building every version on load.
+        """
+        version = cls.__new__(cls)
+        version.version = data["version"]
+        version.encrypted_value = data["encrypted_value"]
+        version.timestamp = data.get("timestamp") or iso_utc_now()
+        version.metadata = data.get("metadata") or {}
+        return version
+
+
+def _decode_legacy_values(versions: List[SecretVersion]) -> None:
+    """
+    Replace base64 ciphertext/nonce strings written by earlier versions with bytes.
+
+    Decoding once per load keeps the base64 step out of every later decrypt.
+    Fields that are not valid base64 are left for decrypt() to report.
+    """
+    a2b = binascii.a2b_base64
+    for version in versions:
+        value = version.encrypted_value
+        if type(value.get("ciphertext")) is not str and type(value.get("nonce")) is not str:
+            continue
+        value = dict(value)
+        for field in ("ciphertext", "nonce"):
+            if type(value.get(field)) is str:
+                try:
+                    value[field] = a2b(value[field])
+                except (binascii.Error, ValueError):
+                    pass
+        version.encrypted_value = value
 
 
 class VersionManager:
@@ -64,11 +104,22 @@ class VersionManager:
 
     def __init__(self) -> None:
         """Initialize the version manager."""
-        # Storage format: {key: {versions: [SecretVersion, ...], current_version: int}}
+        # Storage format: {key: {versions: [SecretVersion, ...], current_version: int,
+        #                        by_number: {version number: SecretVersion}}}
         self._secrets: Dict[str, Dict[str, Any]] = {}
+        # to_dict() entries built since the key last changed
+        self._exported: Dict[str, Dict[str, Any]] = {}
+        # list_versions() results built since the key last changed
+        self._listed: Dict[str, List[Dict[str, Any]]] = {}
+        # Keys changed since the last mark_saved()
+        self._unsaved: Set[str] = set()
+        # Keys whose _secrets entry is still the stored dict from from_dict_fast()
+        self._lazy: Set[str] = set()
+        # Serializes building deferred entries, which concurrent readers may race on
+        self._lazy_lock = threading.Lock()
 
     def add_version(
-        self, key: str, encrypted_value: Dict[str, str], metadata: Optional[Dict[str, Any]] = None
+        self, key: str, encrypted_value: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None
     ) -> int:
         """
         Add a new version for a secret key.
@@ -81,12 +132,13 @@ class VersionManager:
         Returns:
             The new version number
         """
-        if key not in self._secrets:
+        data = self._entry(key)
+        if data is None:
             # First version for this key
-            self._secrets[key] = {"versions": [], "current_version": 0}
+            data = self._secrets[key] = {"versions": [], "current_version": 0, "by_number": {}}
 
         # Calculate next version number
-        next_version = self._secrets[key]["current_version"] + 1
+        next_version = data["current_version"] + 1
 
         # Create the version
         version = SecretVersion(
@@ -94,11 +146,51 @@ class VersionManager:
         )
 
         # Add to storage
-        self._secrets[key]["versions"].append(version)
-        self._secrets[key]["current_version"] = next_version
+        data["versions"].append(version)
+        data["by_number"][next_version] = version
+        data["current_version"] = next_version
+        self._touch(key)
 
         return int(next_version)
 
+    def add_versions_bulk(
+        self,
+        items: Dict[str, List[Dict[str, Any]]],
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, int]:
+        """
+        Add new versions for several secret keys in one pass.
+
+        Equivalent to calling add_version() for each encrypted value in
+        order, but each key's entry is looked up and updated once.
+
+        Args:
+            items: Encrypted values to append, oldest first, per secret key
+            metadata: Optional metadata shared by every new version
+
+        Returns:
+            The latest version number of each key in items
+        """
+        timestamp = iso_utc_now()
+        latest = {}
+        for key, encrypted_values in items.items():
+            if not encrypted_values:
+                continue
+            data = self._entry(key)
+            if data is None:
+                data = self._secrets[key] = {"versions": [], "current_version": 0, "by_number": {}}
+            number = data["current_version"]
+            versions = data["versions"]
+            by_number = data["by_number"]
+            for encrypted_value in encrypted_values:
+                number += 1
+                version = SecretVersion(number, encrypted_value, timestamp, metadata)
+                versions.append(version)
+                by_number[number] = version
+            data["current_version"] = latest[key] = number
+            self._touch(key)
+        return latest
+
     def get_version(self, key: str, version: Optional[int] = None) -> Optional[SecretVersion]:
         """
         Get a specific version of a secret.
@@ -110,10 +202,11 @@ class VersionManager:
         Returns:
             SecretVersion if found, None otherwise
         """
-        if key not in self._secrets:
+        data = self._entry(key)
+        if data is None:
             return None
 
-        versions = self._secrets[key]["versions"]
+        versions = data["versions"]
 
         if not versions:
             return None
@@ -125,12 +218,8 @@ class VersionManager:
             return last_version
 
         # Find specific version
-        for v in versions:
-            if v.version == version:
-                assert isinstance(v, SecretVersion)
-                return v
-
-        return None
+        found: Optional[SecretVersion] = data["by_number"].get(version)
+        return found
 
     def list_versions(self, key: str) -> List[Dict[str, Any]]:
         """
@@ -139,18 +228,22 @@ class VersionManager:
         Args:
             key: Secret key name
 
+        Each call returns fresh entries with copied metadata, since loaded
+        versions may share their dicts with other vaults on the same file.
+
         Returns:
             List of version metadata (without encrypted values)
         """
-        if key not in self._secrets:
-            return []
-
-        versions = self._secrets[key]["versions"]
-
-        return [
-            {"version": v.version, "timestamp": v.timestamp, "metadata": v.metadata}
-            for v in versions
-        ]
+        listed = self._listed.get(key)
+        if listed is None:
+            data = self._entry(key)
+            if data is None:
+                return []
+            listed = self._listed[key] = [
+                {"version": v.version, "timestamp": v.timestamp, "metadata": v.metadata}
+                for v in data["versions"]
+            ]
+        return [{**entry, "metadata": copy.deepcopy(entry["metadata"])} for entry in listed]
 
     def delete_key(self, key: str) -> bool:
         """
@@ -164,6 +257,8 @@ class VersionManager:
         """
         if key in self._secrets:
             del self._secrets[key]
+            self._lazy.discard(key)
+            self._touch(key)
             return True
         return False
 
@@ -178,59 +273,192 @@ class VersionManager:
         Returns:
             True if version was deleted, False if not found
         """
-        if key not in self._secrets:
+        data = self._entry(key)
+        if data is None:
             return False
 
-        versions = self._secrets[key]["versions"]
-        original_count = len(versions)
+        removed = data["by_number"].pop(version, None)
+        if removed is None:
+            return False
 
         # Remove the version
-        self._secrets[key]["versions"] = [v for v in versions if v.version != version]
+        data["versions"].remove(removed)
+        self._touch(key)
+        return True
 
-        return len(self._secrets[key]["versions"]) < original_count
+    def __contains__(self, key: str) -> bool:
+        """Check whether a secret key has at least one stored version."""
+        data = self._secrets.get(key)
+        return bool(data and data["versions"])
 
     def get_all_keys(self) -> List[str]:
-        """Get list of all secret keys."""
+        """Get list of all secret keys, in the order they were first added."""
         return list(self._secrets.keys())
 
-    def rotate_key(self, old_key: bytes, new_key: bytes, crypto_engine: Any) -> None:
+    def version_counts(self) -> List[Tuple[str, int]]:
+        """Get (key, number of stored versions) pairs for all secret keys."""
+        return [(key, len(data["versions"])) for key, data in self._secrets.items()]
+
+    def rotate_key(
+        self,
+        old_key: bytes,
+        new_key: bytes,
+        crypto_engine: Any,
+        max_workers: Optional[int] = None,
+    ) -> None:
         """
         Re-encrypt all secrets with a new master key.
 
+        Versions are re-encrypted in chunks through the batch crypto API, so
+        the ciphers are set up once per chunk rather than once per version.
+        Large vaults spread their chunks over a thread pool; the AEAD work
+        runs in native code that releases the GIL.
+
         Args:
             old_key: Current encryption key
             new_key: New encryption key to use
             crypto_engine: CryptoEngine instance for encryption/decryption
+            max_workers: Upper bound on worker threads (default: CPU count)
         """
-        for key in self._secrets:
-            for version in self._secrets[key]["versions"]:
-                # Decrypt with old key
-                try:
-                    plaintext = crypto_engine.decrypt(version.encrypted_value, old_key)
-
-                    # Re-encrypt with new key
-                    new_encrypted = crypto_engine.encrypt(plaintext, new_key)
-                    version.encrypted_value = new_encrypted
+        for key in list(self._lazy):
+            self._entry(key)
+        items = [
+            (key, version) for key, data in self._secrets.items() for version in data["versions"]
+        ]
 
-                except Exception as e:
-                    # Log error but continue with other secrets
-                    print(f"Warning: Failed to rotate key for {key} v{version.version}: {e}")
+        def rotate_chunk(chunk: List[Tuple[str, SecretVersion]]) -> None:
+            # Decrypt with old key, setting up each cipher once per chunk
+            try:
+                plaintexts = crypto_engine.decrypt_batch(
+                    [version.encrypted_value for _, version in chunk], old_key
+                )
+                rotated = chunk
+            except Exception:
+                # Retry one by one to find and skip the values that fail
+                rotated, plaintexts = [], []
+                for key, version in chunk:
+                    try:
+                        plaintexts.append(crypto_engine.decrypt(version.encrypted_value, old_key))
+                        rotated.append((key, version))
+                    except Exception as e:
+                        # Log error but continue with other secrets
+                        print(f"Warning: Failed to rotate key for {key} v{version.version}: {e}")
+
+            # Re-encrypt with new key
+            for (_, version), new_encrypted in zip(
+                rotated, crypto_engine.encrypt_batch(plaintexts, new_key)
+            ):
+                version.encrypted_value = new_encrypted
+
+        # Every stored value gets a new ciphertext
+        self._exported.clear()
+        self._unsaved.update(self._secrets)
+
+        workers = min(max_workers or os.cpu_count() or 1, len(items) // _ROTATE_CHUNK)
+        if workers <= 1:
+            rotate_chunk(items)
+            return
+
+        chunks = [items[i : i + _ROTATE_CHUNK] for i in range(0, len(items), _ROTATE_CHUNK)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Consume the results so worker exceptions propagate
+            for _ in pool.map(rotate_chunk, chunks):
+                pass
+
+    def _touch(self, key: str) -> None:
+        """Record that a key's versions changed."""
+        self._exported.pop(key, None)
+        self._listed.pop(key, None)
+        self._unsaved.add(key)
+
+    def unsaved_keys(self) -> Set[str]:
+        """Get the keys changed since the last mark_saved() call."""
+        return set(self._unsaved)
+
+    def mark_saved(self, keys: Set[str]) -> None:
+        """Record that the given keys have been written to storage."""
+        self._unsaved -= keys
 
     def to_dict(self) -> Dict[str, Any]:
-        """Export all secrets to dictionary for storage."""
-        return {
-            key: {
-                "versions": [v.to_dict() for v in data["versions"]],
-                "current_version": data["current_version"],
-            }
-            for key, data in self._secrets.items()
-        }
+        """
+        Export all secrets to dictionary for storage.
+
+        Entries of unchanged keys are reused from the previous export, so
+        the returned entries must be treated as read-only.
+        """
+        exported = self._exported
+        result = {}
+        for key in self._secrets:
+            entry = exported.get(key)
+            if entry is None:
+                data = self._entry(key)
+                assert data is not None
+                entry = exported[key] = {
+                    "versions": [v.to_dict() for v in data["versions"]],
+                    "current_version": data["current_version"],
+                }
+            result[key] = entry
+        return result
 
     def from_dict(self, data: Dict[str, Any]) -> None:
         """Import secrets from dictionary."""
         self._secrets = {}
+        self._exported = {}
+        self._listed = {}
+        self._lazy = set()
         for key, key_data in data.items():
+            versions = [SecretVersion.from_dict(v) for v in key_data["versions"]]
+            _decode_legacy_values(versions)
             self._secrets[key] = {
-                "versions": [SecretVersion.from_dict(v) for v in key_data["versions"]],
+                "versions": versions,
                 "current_version": key_data["current_version"],
+                "by_number": {v.version: v for v in versions},
             }
+        # Storage has not seen this data through us yet
+        self._unsaved = set(self._secrets)
+
+    @classmethod
+    def from_dict_fast(cls, data: Dict[str, Any]) -> "VersionManager":
+        """
+        Create a manager from a to_dict() export without building its versions.
+
+        The stored entries are kept as they are and each key's SecretVersion
+        objects are created on first access, so loading a large export and
+        reading a few keys skips most of the work done by from_dict(). The
+        entries are not modified and may be shared with the caller.
+
+        Malformed keys are reported here; malformed versions only when their
+        key is first accessed.
+
+        Args:
+            data: Secrets as returned by to_dict()
+
+        Returns:
+            A new VersionManager holding data
+        """
+        manager = cls()
+        for key, key_data in data.items():
+            if not isinstance(key_data.get("versions"), list) or "current_version" not in key_data:
+                raise ValueError(f"Malformed entry for secret {key!r}")
+        manager._secrets = dict(data)
+        manager._lazy = set(data)
+        manager._unsaved = set(data)
+        return manager
+
+    def _entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a key's storage entry, building its versions if still deferred."""
+        if key in self._lazy:
+            with self._lazy_lock:
+                # Another thread may have built it while we waited
+                if key in self._lazy:
+                    key_data = self._secrets[key]
+                    versions = [SecretVersion.from_dict(v) for v in key_data["versions"]]
+                    _decode_legacy_values(versions)
+                    self._secrets[key] = {
+                        "versions": versions,
+                        "current_version": key_data["current_version"],
+                        "by_number": {v.version: v for v in versions},
+                    }
+                    # Publish the built entry before readers stop taking the lock
+                    self._lazy.discard(key)
+        return self._secrets.get(key)
@@ -0,0 +1 @@
+"""Performance benchmarks, run separately with ``pytest tests/benchmarks``."""
@@ -0,0 +1,113 @@
+"""Benchmarks for the crypto and vault hot paths.
+
+These are not collected by a plain ``pytest`` run; invoke them explicitly with
+``pytest tests/benchmarks --benchmark-only``. Inputs are generated from a fixed
+seed so that runs are comparable.
+"""
+
+import itertools
+import random
+import string
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from mobile_secrets_vault import CryptoEngine, MobileSecretsVault  # noqa: E402
+
+PAYLOAD_SIZES = [32, 1024, 64 * 1024]
+SECRET_COUNTS = [10, 1_000, 10_000]
+
+
+def _payload(size, seed=0):
+    """Return a deterministic printable payload of ``size`` characters."""
+    rng = random.Random(seed)
+    return "".join(rng.choices(string.ascii_letters + string.digits, k=size))
+
+
+def _open_vault(path, master_key, count):
+    """Create a vault at ``path`` holding ``count`` 32-byte secrets."""
+    vault = MobileSecretsVault(
+        master_key=master_key,
+        secrets_filepath=str(path / "secrets.yaml"),
+        auto_save=False,
+        audit=False,
+    )
+    value = _payload(32)
+    for i in range(count):
+        vault.set(f"KEY_{i}", value)
+    vault.save()
+    vault.auto_save = True
+    return vault
+
+
+@pytest.fixture(scope="module")
+def master_key():
+    """Master key shared by every benchmark in the module."""
+    return CryptoEngine.generate_key()
+
+
+@pytest.fixture(scope="module", params=SECRET_COUNTS, ids=lambda n: f"n{n}")
+def populated_vault(request, tmp_path_factory, master_key):
+    """Vault holding ``n`` secrets, shared by the read-only benchmarks."""
+    return _open_vault(tmp_path_factory.mktemp("bench"), master_key, request.param)
+
+
+class TestCryptoBench:
+    """Encrypt/decrypt throughput across payload sizes."""
+
+    @pytest.mark.parametrize("size", PAYLOAD_SIZES, ids=lambda s: f"{s}B")
+    def test_encrypt(self, benchmark, master_key, size):
+        benchmark(CryptoEngine.encrypt, _payload(size), master_key)
+
+    @pytest.mark.parametrize("size", PAYLOAD_SIZES, ids=lambda s: f"{s}B")
+    def test_decrypt(self, benchmark, master_key, size):
+        payload = _payload(size)
+        encrypted = CryptoEngine.encrypt(payload, master_key)
+        assert benchmark(CryptoEngine.decrypt, encrypted, master_key) == payload
+
+
+class TestVaultBench:
+    """Vault operations across vault sizes."""
+
+    def test_get(self, benchmark, populated_vault):
+        assert benchmark(populated_vault.get, "KEY_0") == _payload(32)
+
+    @pytest.mark.parametrize("count", SECRET_COUNTS, ids=lambda n: f"n{n}")
+    def test_set(self, benchmark, tmp_path, master_key, count):
+        vault = _open_vault(tmp_path, master_key, count)
+        keys = itertools.cycle([f"KEY_{i}" for i in range(count)])
+        value = _payload(32, seed=1)
+        benchmark(lambda: vault.set(next(keys), value))
+
+    @pytest.mark.parametrize("count", SECRET_COUNTS, ids=lambda n: f"n{n}")
+    def test_rotate(self, benchmark, tmp_path, master_key, count):
+        vault = _open_vault(tmp_path, master_key, count)
+        benchmark.pedantic(vault.rotate, rounds=3)
+
+    def test_load(self, benchmark, populated_vault, master_key):
+        filepath = populated_vault.storage.filepath
+        vault = benchmark(
+            MobileSecretsVault,
+            master_key=master_key,
+            secrets_filepath=str(filepath),
+            audit=False,
+        )
+        assert vault.get("KEY_0") == _payload(32)
+
+
+def test_smoke_roundtrip(tmp_path, master_key):
+    """Correctness check for the benchmarked paths, independent of timings."""
+    vault = _open_vault(tmp_path, master_key, 10)
+    payload = _payload(1024)
+    vault.set("KEY_0", payload)
+    vault.rotate()
+
+    reopened = MobileSecretsVault(
+        master_key=vault.master_key,
+        secrets_filepath=str(tmp_path / "secrets.yaml"),
+        audit=False,
+    )
+    assert reopened.get("KEY_0") == payload
+    assert reopened.get("KEY_9") == _payload(32)
+    assert len(reopened.list_keys()) == 10
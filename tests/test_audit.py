@@ -5,7 +5,7 @@ from pathlib import Path
 import tempfile
 import json
 
-from mobile_secrets_vault.audit import AuditLogger, Operation
+from mobile_secrets_vault.audit import AuditLogger, Operation, _encode_entry
 
 
 class TestAuditLogger:
@@ -68,6 +68,20 @@ class TestAuditLogger:
         assert len(get_logs) == 2
         assert all(log["operation"] == "get" for log in get_logs)
 
+    def test_filter_by_key_and_operation(self):
+        """Test combining key and operation filters."""
+        logger = AuditLogger(in_memory=True)
+
+        logger.log(Operation.SET, key="KEY1", success=True)
+        logger.log(Operation.GET, key="KEY1", success=True)
+        logger.log(Operation.GET, key="KEY2", success=True)
+        logger.log(Operation.GET, key="KEY1", success=False, error="boom")
+
+        logs = logger.get_logs(key="KEY1", operation=Operation.GET, limit=10)
+        assert len(logs) == 2
+        assert logs[0]["success"] is False
+        assert logger.get_logs(key="MISSING") == []
+
     def test_limit_logs(self):
         """Test limiting the number of returned logs."""
         logger = AuditLogger(in_memory=True)
@@ -78,6 +92,21 @@ class TestAuditLogger:
         logs = logger.get_logs(limit=5)
         assert len(logs) == 5
 
+    def test_max_in_memory(self):
+        """Test that only the most recent entries are kept in memory."""
+        logger = AuditLogger(in_memory=True, max_in_memory=3)
+
+        for i in range(5):
+            logger.log(Operation.SET, key=f"KEY{i}", success=True)
+        logger.log(Operation.GET, key="KEY4", success=True)
+
+        logs = logger.get_logs()
+        assert [log["key"] for log in logs] == ["KEY4", "KEY4", "KEY3"]
+        assert logger.get_logs(key="KEY0") == []
+        assert len(logger.get_logs(operation=Operation.SET)) == 2
+        assert len(logger.get_logs(key="KEY4", operation=Operation.SET)) == 1
+        assert logger.get_logs(key="KEY1", operation=Operation.SET) == []
+
     def test_logs_ordered_by_time(self):
         """Test that logs are returned in reverse chronological order."""
         logger = AuditLogger(in_memory=True)
@@ -122,6 +151,161 @@ class TestAuditLogger:
             # Should have loaded previous logs
             assert len(logs) >= 2
 
+    def test_load_keeps_most_recent(self):
+        """Test that loading a log file keeps only the in-memory window."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_file = Path(tmpdir) / "audit.log"
+            logger = AuditLogger(log_file=log_file)
+            for i in range(10):
+                logger.log(Operation.SET, key=f"KEY{i}", success=True)
+            logger.close()
+
+            logger2 = AuditLogger(log_file=log_file, max_in_memory=3)
+            logs = logger2.get_logs()
+            assert [log["key"] for log in logs] == ["KEY9", "KEY8", "KEY7"]
+
+            # Reading in blocks smaller than a line must give the same tail
+            with open(log_file, "rb") as f:
+                lines = AuditLogger._read_tail(f, 3, block_size=16)
+            assert [json.loads(line)["key"] for line in lines] == ["KEY7", "KEY8", "KEY9"]
+
+    def test_load_out_of_order_file(self):
+        """Test that entries appended out of order are reordered on load."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_file = Path(tmpdir) / "audit.log"
+            entries = [
+                {"timestamp": "2024-01-01T00:00:02Z", "operation": "get", "key": "B"},
+                {"timestamp": "2024-01-01T00:00:01Z", "operation": "set", "key": "A"},
+                {"timestamp": "2024-01-01T00:00:03Z", "operation": "get", "key": "C"},
+            ]
+            log_file.write_text("".join(json.dumps(e) + "\n" for e in entries))
+
+            logger = AuditLogger(log_file=log_file)
+            assert [log["key"] for log in logger.get_logs()] == ["C", "B", "A"]
+
+    def test_snapshot_reload(self):
+        """Test that the parsed-log snapshot is used only while it is fresh."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_file = Path(tmpdir) / "audit.log"
+            logger = AuditLogger(log_file=log_file)
+            logger.log(Operation.SET, key="KEY1", success=True)
+            logger.close()
+
+            snapshot = Path(tmpdir) / "audit.log.cache"
+            assert snapshot.exists()
+
+            logger2 = AuditLogger(log_file=log_file)
+            assert [log["key"] for log in logger2.get_logs()] == ["KEY1"]
+
+            # An external append makes the snapshot stale
+            with open(log_file, "a") as f:
+                f.write(json.dumps({"timestamp": "9999", "operation": "get", "key": "KEY2"}))
+                f.write("\n")
+
+            logger3 = AuditLogger(log_file=log_file)
+            assert [log["key"] for log in logger3.get_logs()] == ["KEY2", "KEY1"]
+
+            logger3.clear_logs()
+            assert not snapshot.exists()
+
+    def test_snapshot_does_not_hide_other_writers(self):
+        """Test that a close-time snapshot never covers lines another logger appended."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_file = Path(tmpdir) / "audit.log"
+            logger_a = AuditLogger(log_file=log_file)
+            logger_b = AuditLogger(log_file=log_file)
+
+            logger_a.log(Operation.SET, key="FROM_A", success=True)
+            logger_b.log(Operation.SET, key="FROM_B", success=True)
+            logger_b.close()
+            logger_a.close()
+
+            reloaded = AuditLogger(log_file=log_file)
+            assert sorted(log["key"] for log in reloaded.get_logs()) == ["FROM_A", "FROM_B"]
+
+            # A sole writer still leaves a snapshot the next load can use
+            reloaded.log(Operation.GET, key="FROM_A", success=True)
+            reloaded.close()
+            assert reloaded._load_snapshot() is not None
+            assert len(AuditLogger(log_file=log_file).get_logs()) == 3
+
+    def test_batched_logging(self):
+        """Test that batched entries are written once the batch fills or on flush."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_file = Path(tmpdir) / "audit.log"
+            logger = AuditLogger(log_file=log_file, batch_size=3)
+
+            logger.log(Operation.SET, key="KEY1", success=True)
+            logger.log(Operation.SET, key="KEY2", success=True)
+            assert not log_file.exists()
+
+            logger.log(Operation.SET, key="KEY3", success=True)
+            assert len(log_file.read_text().splitlines()) == 3
+
+            logger.log(Operation.ROTATE, success=True, sync=True)
+            assert len(log_file.read_text().splitlines()) == 4
+
+            logger.log(Operation.GET, key="KEY1", success=True)
+            logger.close()
+            assert len(log_file.read_text().splitlines()) == 5
+
+    def test_background_flush(self):
+        """Test that a partial batch is written by the background flusher."""
+        import time
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_file = Path(tmpdir) / "audit.log"
+            logger = AuditLogger(log_file=log_file, batch_size=100, flush_interval_ms=10)
+
+            logger.log(Operation.SET, key="KEY1", success=True)
+            deadline = time.monotonic() + 5
+            while not log_file.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert len(log_file.read_text().splitlines()) == 1
+            logger.close()
+            assert not logger._flusher.is_alive()
+
+    def test_clear_logs_with_background_flusher(self):
+        """Test that clearing does not wait on the flusher, which keeps running afterwards."""
+        import time
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_file = Path(tmpdir) / "audit.log"
+            logger = AuditLogger(log_file=log_file, batch_size=100, flush_interval_ms=1)
+
+            for i in range(20):
+                logger.log(Operation.SET, key=f"KEY{i}", success=True)
+                time.sleep(0.001)
+                logger.clear_logs()
+
+            assert logger._flusher.is_alive()
+            logger.log(Operation.GET, key="AFTER", success=True)
+            deadline = time.monotonic() + 5
+            while not log_file.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert "AFTER" in log_file.read_text()
+            logger.close()
+
+    def test_collected_logger_writes_partial_batch(self):
+        """Test that a discarded logger writes its batch and releases its thread and file."""
+        import gc
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_file = Path(tmpdir) / "audit.log"
+            logger = AuditLogger(log_file=log_file, batch_size=100, flush_interval_ms=10_000)
+            logger.log(Operation.SET, key="KEY1", success=True)
+            logger.log(Operation.SET, key="KEY2", success=True, sync=True)
+            logger.log(Operation.GET, key="KEY1", success=True)
+            flusher = logger._flusher
+
+            del logger
+            gc.collect()
+
+            assert len(log_file.read_text().splitlines()) == 3
+            flusher.join(timeout=5)
+            assert not flusher.is_alive()
+
     def test_export_json(self):
         """Test exporting logs to JSON."""
         logger = AuditLogger(in_memory=True)
@@ -142,6 +326,28 @@ class TestAuditLogger:
             assert len(data) == 2
             assert data[0]["operation"] == "set"
 
+    def test_export_csv(self):
+        """Test exporting logs to CSV."""
+        import csv
+
+        logger = AuditLogger(in_memory=True)
+
+        logger.log(Operation.SET, key="KEY1", success=True)
+        logger.log(Operation.GET, key="KEY1", success=False, error="boom")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_path = Path(tmpdir) / "export.csv"
+            logger.export_logs(output_path, format="csv")
+
+            with open(output_path, newline="") as f:
+                rows = list(csv.DictReader(f))
+
+            assert len(rows) == 2
+            assert rows[0]["operation"] == "set"
+            assert rows[1]["key"] == "KEY1"
+            assert rows[1]["success"] == "False"
+            assert rows[1]["error"] == "boom"
+
     def test_timestamp_format(self):
         """Test that timestamps are in ISO format."""
         logger = AuditLogger(in_memory=True)
@@ -153,3 +359,57 @@ class TestAuditLogger:
         # Should be ISO format ending with 'Z' (UTC)
         assert timestamp.endswith("Z")
         assert "T" in timestamp
+
+    def test_timestamps_parse_and_increase(self):
+        """Test that timestamps are valid ISO-8601 and non-decreasing."""
+        from datetime import datetime
+
+        logger = AuditLogger(in_memory=True)
+        for _ in range(5):
+            logger.log(Operation.GET, key="KEY", success=True)
+
+        timestamps = [log["timestamp"] for log in reversed(logger.get_logs())]
+        for timestamp in timestamps:
+            datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%fZ")
+        assert timestamps == sorted(timestamps)
+
+    def test_concurrent_logging(self):
+        """Test that entries logged from several threads are all kept."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_file = Path(tmpdir) / "audit.log"
+            logger = AuditLogger(log_file=log_file, batch_size=4)
+
+            def worker(n):
+                for i in range(50):
+                    logger.log(Operation.GET, key=f"KEY{n}", success=True)
+
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(worker, range(8)))
+            logger.close()
+
+            assert len(logger.get_logs()) == 400
+            assert len(logger.get_logs(key="KEY3")) == 50
+            assert len(log_file.read_text().splitlines()) == 400
+
+    @pytest.mark.parametrize(
+        "key, error, metadata",
+        [
+            ("API_KEY", None, {}),
+            (None, 'bad "value"\n', {"version": 2}),
+            ("KLÜSSEL", None, {"nested": {"a": [1, None]}}),
+        ],
+    )
+    def test_encode_entry_matches_json(self, key, error, metadata):
+        """Test that the templated entry encoder matches json.dumps."""
+        entry = {
+            "timestamp": "2024-01-01T00:00:00.000000+00:00",
+            "operation": Operation.GET.value,
+            "key": key,
+            "success": error is None,
+            "error": error,
+            "metadata": metadata,
+        }
+
+        assert _encode_entry(entry) == json.dumps(entry, separators=(",", ":")).encode("utf-8")
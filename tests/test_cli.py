@@ -1,362 +1,218 @@
 """Integration tests for the CLI."""
 
+import contextlib
+import io
 import pytest
 from click.testing import CliRunner
-import tempfile
-from pathlib import Path
+import shutil
 
 from mobile_secrets_vault.cli import cli
-from mobile_secrets_vault import CryptoEngine
+from mobile_secrets_vault import MobileSecretsVault
+
+
+def _seed(vault_dir, items):
+    """Store (key, value) pairs through the API, as setup for the command under test."""
+    vault = MobileSecretsVault(
+        master_key_file=str(vault_dir / "master.key"),
+        secrets_filepath=str(vault_dir / "secrets.yaml"),
+        auto_save=False,
+    )
+    for key, value in items:
+        vault.set(key, value)
+    vault.save()
+
+
+def _run(args):
+    """Run the CLI in-process without CliRunner, for commands that read no input."""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        exit_code = cli.main(args, prog_name="vault", standalone_mode=False)
+    return exit_code or 0, out.getvalue()
+
+
+@pytest.fixture(scope="class")
+def runner():
+    """Create CLI test runner."""
+    return CliRunner()
+
+
+@pytest.fixture(scope="session")
+def vault_template(tmp_path_factory):
+    """Vault directory initialized once per session by 'init'."""
+    template = tmp_path_factory.mktemp("vault_template")
+    result = CliRunner().invoke(cli, ["init", "--output-dir", str(template)])
+    assert result.exit_code == 0
+    return template
 
 
 class TestCLI:
     """Test cases for command-line interface."""
 
     @pytest.fixture
-    def runner(self):
-        """Create CLI test runner."""
-        return CliRunner()
+    def temp_dir(self, tmp_path):
+        """Create temporary directory for tests."""
+        return tmp_path
 
     @pytest.fixture
-    def temp_dir(self):
-        """Create temporary directory for tests."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            yield Path(tmpdir)
+    def vault_dir(self, vault_template, temp_dir):
+        """Private copy of the initialized vault directory."""
+        shutil.copytree(vault_template, temp_dir, dirs_exist_ok=True)
+        return temp_dir
 
-    def test_cli_version(self, runner):
+    @pytest.fixture
+    def vault_args(self, vault_dir):
+        """Global options pointing the CLI at the copied vault."""
+        return [
+            "--vault-file",
+            str(vault_dir / "secrets.yaml"),
+            "--master-key-file",
+            str(vault_dir / "master.key"),
+        ]
+
+    def test_cli_version(self):
         """Test --version flag."""
-        result = runner.invoke(cli, ["--version"])
-        assert result.exit_code == 0
-        assert "0.1.0" in result.output
-
-    def test_init_command(self, runner, temp_dir):
-        """Test vault init command."""
-        result = runner.invoke(cli, ["init", "--output-dir", str(temp_dir / ".vault")])
-
-        assert result.exit_code == 0
-        assert (temp_dir / ".vault" / "master.key").exists()
-        assert (temp_dir / ".vault" / "secrets.yaml").exists()
-        assert "✅" in result.output
-
-    def test_init_existing_vault(self, runner, temp_dir):
-        """Test init fails if vault already exists."""
+        exit_code, output = _run(["--version"])
+        assert exit_code == 0
+        assert "0.1.0" in output
+
+    @pytest.mark.parametrize(
+        "old_key, flags, exit_code, message",
+        [
+            (None, [], 0, "✅"),
+            (b"old key", [], 1, "already exists"),
+            (b"old key", ["--force"], 0, "✅"),
+        ],
+        ids=["new", "existing", "force"],
+    )
+    def test_init_command(self, runner, temp_dir, old_key, flags, exit_code, message):
+        """Test that init creates a vault, replacing an existing one only with --force."""
         vault_dir = temp_dir / ".vault"
-        vault_dir.mkdir()
-        (vault_dir / "master.key").touch()
+        if old_key is not None:
+            vault_dir.mkdir()
+            (vault_dir / "master.key").write_bytes(old_key)
 
-        result = runner.invoke(cli, ["init", "--output-dir", str(vault_dir)])
+        result = runner.invoke(cli, ["init", "--output-dir", str(vault_dir), *flags])
 
-        assert result.exit_code == 1
-        assert "already exists" in result.output
+        assert result.exit_code == exit_code
+        assert message in result.output
+        # The key is only left alone when init refuses to run
+        assert ((vault_dir / "master.key").read_bytes() == old_key) == (exit_code == 1)
+        if exit_code == 0:
+            assert (vault_dir / "secrets.yaml").exists()
+
+    def test_init_key_file_is_private(self, runner, temp_dir):
+        """Test that the master key file is created readable only by the owner."""
+        import stat
 
-    def test_init_force_overwrite(self, runner, temp_dir):
-        """Test init with --force overwrites existing vault."""
         vault_dir = temp_dir / ".vault"
         vault_dir.mkdir()
-        (vault_dir / "master.key").write_bytes(b"old key")
+        key_file = vault_dir / "master.key"
+        key_file.write_bytes(b"old key")
+        key_file.chmod(0o644)
 
         result = runner.invoke(cli, ["init", "--output-dir", str(vault_dir), "--force"])
 
         assert result.exit_code == 0
-        # Key should be different
-        assert (vault_dir / "master.key").read_bytes() != b"old key"
+        assert stat.S_IMODE(key_file.stat().st_mode) == 0o600
 
-    def test_set_and_get_secret(self, runner, temp_dir):
+    def test_set_and_get_secret(self, runner, vault_args):
         """Test setting and getting a secret via CLI."""
-        # Initialize vault
-        runner.invoke(cli, ["init", "--output-dir", str(temp_dir)])
-
         # Set a secret
-        result = runner.invoke(
-            cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "set",
-                "TEST_KEY",
-                "test-value",
-            ],
-        )
+        result = runner.invoke(cli, [*vault_args, "set", "TEST_KEY", "test-value"])
         assert result.exit_code == 0
-        assert "✅" in result.output
+        assert "✅".encode() in result.stdout_bytes
 
         # Get the secret
-        result = runner.invoke(
-            cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "get",
-                "TEST_KEY",
-            ],
-        )
+        result = runner.invoke(cli, [*vault_args, "get", "TEST_KEY"])
         assert result.exit_code == 0
-        assert "test-value" in result.output
+        assert b"test-value" in result.stdout_bytes
 
-    def test_set_with_stdin(self, runner, temp_dir):
+    def test_set_with_stdin(self, runner, vault_args):
         """Test setting secret from stdin."""
-        runner.invoke(cli, ["init", "--output-dir", str(temp_dir)])
-
         result = runner.invoke(
             cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "set",
-                "API_KEY",
-                "--stdin",
-            ],
+            [*vault_args, "set", "API_KEY", "--stdin"],
             input="secret-from-stdin",
         )
 
         assert result.exit_code == 0
 
-    def test_get_raw_output(self, runner, temp_dir):
+    def test_get_raw_output(self, runner, vault_dir, vault_args):
         """Test getting secret with --raw flag."""
-        runner.invoke(cli, ["init", "--output-dir", str(temp_dir)])
-
-        runner.invoke(
-            cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "set",
-                "RAW_KEY",
-                "raw-value",
-            ],
-        )
+        _seed(vault_dir, [("RAW_KEY", "raw-value")])
 
-        result = runner.invoke(
-            cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "get",
-                "RAW_KEY",
-                "--raw",
-            ],
-        )
+        result = runner.invoke(cli, [*vault_args, "get", "RAW_KEY", "--raw"])
 
-        assert result.output.strip() == "raw-value"
+        assert result.stdout_bytes.strip() == b"raw-value"
 
-    def test_get_nonexistent_secret(self, runner, temp_dir):
+    def test_get_nonexistent_secret(self, runner, vault_args):
         """Test getting a secret that doesn't exist."""
-        runner.invoke(cli, ["init", "--output-dir", str(temp_dir)])
-
-        result = runner.invoke(
-            cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "get",
-                "NONEXISTENT",
-            ],
-        )
+        result = runner.invoke(cli, [*vault_args, "get", "NONEXISTENT"])
 
         assert result.exit_code == 1
         assert "not found" in result.output
 
-    def test_delete_secret(self, runner, temp_dir):
+    def test_delete_secret(self, runner, vault_dir, vault_args):
         """Test deleting a secret."""
-        runner.invoke(cli, ["init", "--output-dir", str(temp_dir)])
-
-        # Set a secret
-        runner.invoke(
-            cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "set",
-                "DELETEME",
-                "value",
-            ],
-        )
+        _seed(vault_dir, [("DELETEME", "value")])
 
         # Delete with --yes to skip confirmation
-        result = runner.invoke(
-            cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "delete",
-                "DELETEME",
-                "--yes",
-            ],
-        )
+        result = runner.invoke(cli, [*vault_args, "delete", "DELETEME", "--yes"])
 
         assert result.exit_code == 0
-        assert "✅" in result.output
+        assert "✅".encode() in result.stdout_bytes
 
-    def test_list_versions(self, runner, temp_dir):
+    def test_list_versions(self, runner, vault_dir, vault_args):
         """Test listing version history."""
-        runner.invoke(cli, ["init", "--output-dir", str(temp_dir)])
-
         # Create multiple versions
-        for i in range(3):
-            runner.invoke(
-                cli,
-                [
-                    "--vault-file",
-                    str(temp_dir / "secrets.yaml"),
-                    "--master-key-file",
-                    str(temp_dir / "master.key"),
-                    "set",
-                    "VERSIONED",
-                    f"value-{i}",
-                ],
-            )
+        _seed(vault_dir, [("VERSIONED", f"value-{i}") for i in range(3)])
 
-        result = runner.invoke(
-            cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "list-versions",
-                "VERSIONED",
-            ],
-        )
+        result = runner.invoke(cli, [*vault_args, "list-versions", "VERSIONED"])
 
         assert result.exit_code == 0
-        assert "Version 1" in result.output
-        assert "Version 2" in result.output
-        assert "Version 3" in result.output
+        assert b"Version 1" in result.stdout_bytes
+        assert b"Version 2" in result.stdout_bytes
+        assert b"Version 3" in result.stdout_bytes
 
-    def test_list_keys(self, runner, temp_dir):
+    def test_list_keys(self, vault_dir, vault_args):
         """Test listing all keys."""
-        runner.invoke(cli, ["init", "--output-dir", str(temp_dir)])
-
         # Add multiple secrets
-        for key in ["KEY1", "KEY2", "KEY3"]:
-            runner.invoke(
-                cli,
-                [
-                    "--vault-file",
-                    str(temp_dir / "secrets.yaml"),
-                    "--master-key-file",
-                    str(temp_dir / "master.key"),
-                    "set",
-                    key,
-                    "value",
-                ],
-            )
+        _seed(vault_dir, [(key, "value") for key in ["KEY1", "KEY2", "KEY3"]])
 
-        result = runner.invoke(
-            cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "list",
-            ],
-        )
+        exit_code, output = _run([*vault_args, "list"])
 
-        assert result.exit_code == 0
-        assert "KEY1" in result.output
-        assert "KEY2" in result.output
-        assert "KEY3" in result.output
+        assert exit_code == 0
+        assert "KEY1" in output
+        assert "KEY2" in output
+        assert "KEY3" in output
 
-    def test_rotate_command(self, runner, temp_dir):
+    def test_rotate_command(self, runner, vault_dir, vault_args):
         """Test key rotation command."""
-        runner.invoke(cli, ["init", "--output-dir", str(temp_dir)])
-
         # Add a secret
-        runner.invoke(
-            cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "set",
-                "BEFORE_ROTATION",
-                "value",
-            ],
-        )
+        _seed(vault_dir, [("BEFORE_ROTATION", "value")])
 
         # Rotate with --yes to skip confirmation
         result = runner.invoke(
             cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "rotate",
-                "--new-key-file",
-                str(temp_dir / "new_master.key"),
-                "--yes",
-            ],
+            [*vault_args, "rotate", "--new-key-file", str(vault_dir / "new_master.key"), "--yes"],
         )
 
         assert result.exit_code == 0
-        assert "✅" in result.output
-        assert (temp_dir / "new_master.key").exists()
+        assert "✅".encode() in result.stdout_bytes
+        assert (vault_dir / "new_master.key").exists()
 
-    def test_audit_command(self, runner, temp_dir):
+    def test_audit_command(self, vault_dir, vault_args):
         """Test audit log command."""
-        runner.invoke(cli, ["init", "--output-dir", str(temp_dir)])
-
         # Perform some operations
-        runner.invoke(
-            cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "set",
-                "AUDIT_KEY",
-                "value",
-            ],
-        )
-
-        runner.invoke(
-            cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "get",
-                "AUDIT_KEY",
-            ],
-        )
+        _seed(vault_dir, [("AUDIT_KEY", "value")])
 
         # Check audit log
-        result = runner.invoke(
-            cli,
-            [
-                "--vault-file",
-                str(temp_dir / "secrets.yaml"),
-                "--master-key-file",
-                str(temp_dir / "master.key"),
-                "audit",
-            ],
-        )
+        exit_code, output = _run([*vault_args, "audit"])
 
-        assert result.exit_code == 0
+        assert exit_code == 0
         # Check that audit log is shown (init operation should always be there)
-        assert "Audit log" in result.output
-        assert "init" in result.output or "set" in result.output
+        assert "Audit log" in output
+        assert "init" in output or "set" in output
 
     def test_without_master_key(self, runner, temp_dir):
         """Test that commands fail gracefully without master key."""
@@ -1,7 +1,14 @@
 """Unit tests for the crypto module."""
 
 import pytest
-from mobile_secrets_vault.crypto import CryptoEngine
+from cryptography.exceptions import InvalidTag
+from mobile_secrets_vault.crypto import ALG_AES_GCM, ALG_CHACHA20_POLY1305, CryptoEngine
+
+
+@pytest.fixture(scope="class")
+def key():
+    """Key shared by the tests that only need a valid one."""
+    return CryptoEngine.generate_key()
 
 
 class TestCryptoEngine:
@@ -19,11 +26,13 @@ class TestCryptoEngine:
         # Keys should be unique
         assert key1 != key2
 
-    def test_encrypt_decrypt_roundtrip(self):
+    @pytest.mark.parametrize(
+        "plaintext",
+        ["my secret password", "", "x" * 10000, "Hello 世界 🔐 Emoji"],
+        ids=["ascii", "empty", "long", "unicode"],
+    )
+    def test_encrypt_decrypt_roundtrip(self, key, plaintext):
         """Test encryption and decryption roundtrip."""
-        key = CryptoEngine.generate_key()
-        plaintext = "my secret password"
-
         # Encrypt
         encrypted = CryptoEngine.encrypt(plaintext, key)
 
@@ -47,22 +56,21 @@ class TestCryptoEngine:
         encrypted = CryptoEngine.encrypt(plaintext, key1)
 
         # Should raise exception with wrong key
-        with pytest.raises(Exception):
+        with pytest.raises(InvalidTag):
             CryptoEngine.decrypt(encrypted, key2)
 
-    def test_tampering_detection(self):
+    def test_tampering_detection(self, key):
         """Test that tampering with ciphertext is detected."""
-        key = CryptoEngine.generate_key()
         plaintext = "important data"
 
         encrypted = CryptoEngine.encrypt(plaintext, key)
 
         # Tamper with ciphertext
         tampered = encrypted.copy()
-        tampered["ciphertext"] = tampered["ciphertext"][:-5] + "XXXXX"
+        tampered["ciphertext"] = tampered["ciphertext"][:-5] + b"XXXXX"
 
         # Should raise exception
-        with pytest.raises(Exception):
+        with pytest.raises(InvalidTag):
             CryptoEngine.decrypt(tampered, key)
 
     def test_invalid_key_size(self):
@@ -77,9 +85,8 @@ class TestCryptoEngine:
         with pytest.raises(ValueError, match="Key must be 32 bytes"):
             CryptoEngine.decrypt(encrypted, invalid_key)
 
-    def test_malformed_encrypted_data(self):
+    def test_malformed_encrypted_data(self, key):
         """Test decryption with malformed data."""
-        key = CryptoEngine.generate_key()
 
         # Missing fields
         with pytest.raises(ValueError, match="must contain"):
@@ -88,19 +95,50 @@ class TestCryptoEngine:
         with pytest.raises(ValueError, match="must contain"):
             CryptoEngine.decrypt({"ciphertext": "abc"}, key)
 
-    def test_unicode_support(self):
-        """Test encryption of Unicode characters."""
-        key = CryptoEngine.generate_key()
-        plaintext = "Hello 世界 🔐 Emoji"
-
-        encrypted = CryptoEngine.encrypt(plaintext, key)
-        decrypted = CryptoEngine.decrypt(encrypted, key)
-
-        assert decrypted == plaintext
-
-    def test_key_to_from_string(self):
+    def test_decrypt_legacy_base64(self, monkeypatch, key):
+        """Test decrypting values stored as base64 strings by earlier versions."""
+        import base64
+
+        # Earlier versions always used AES-GCM and stored no algorithm name
+        monkeypatch.setattr(CryptoEngine, "ALGORITHM", ALG_AES_GCM)
+        encrypted = CryptoEngine.encrypt("legacy value", key)
+        legacy = {
+            k: base64.b64encode(encrypted[k]).decode("utf-8") for k in ("ciphertext", "nonce")
+        }
+
+        assert CryptoEngine.decrypt(legacy, key) == "legacy value"
+
+        with pytest.raises(ValueError, match="Failed to decode"):
+            CryptoEngine.decrypt({"ciphertext": "@@@", "nonce": "abc"}, key)
+
+    @pytest.mark.parametrize("alg", [ALG_AES_GCM, ALG_CHACHA20_POLY1305])
+    def test_algorithms_roundtrip(self, monkeypatch, alg, key):
+        """Test that each supported algorithm is recorded and used to decrypt."""
+        monkeypatch.setattr(CryptoEngine, "ALGORITHM", alg)
+        encrypted = CryptoEngine.encrypt("value", key)
+        batch = CryptoEngine.encrypt_batch(["a", "b"], key)
+
+        # Decryption follows the stored name, not the current default
+        other = ALG_AES_GCM if alg == ALG_CHACHA20_POLY1305 else ALG_CHACHA20_POLY1305
+        monkeypatch.setattr(CryptoEngine, "ALGORITHM", other)
+
+        assert encrypted["alg"] == alg
+        assert CryptoEngine.decrypt(encrypted, key) == "value"
+        assert CryptoEngine.decrypt_batch(batch + [CryptoEngine.encrypt("c", key)], key) == [
+            "a",
+            "b",
+            "c",
+        ]
+
+    def test_unsupported_algorithm(self, key):
+        """Test that an unknown algorithm name is rejected."""
+        encrypted = dict(CryptoEngine.encrypt("value", key), alg="ROT13")
+
+        with pytest.raises(ValueError, match="Unsupported encryption algorithm"):
+            CryptoEngine.decrypt(encrypted, key)
+
+    def test_key_to_from_string(self, key):
         """Test key serialization to/from base64 string."""
-        key = CryptoEngine.generate_key()
 
         # Convert to string
         key_string = CryptoEngine.key_to_string(key)
@@ -110,22 +148,43 @@ class TestCryptoEngine:
         key_restored = CryptoEngine.string_to_key(key_string)
         assert key_restored == key
 
-    def test_empty_plaintext(self):
-        """Test encrypting empty string."""
-        key = CryptoEngine.generate_key()
-        plaintext = ""
+    def test_batch_roundtrip(self, key):
+        """Test batch encryption and decryption with a single key."""
+        plaintexts = ["first", "second", "", "ünïcödé 🔐"]
 
-        encrypted = CryptoEngine.encrypt(plaintext, key)
-        decrypted = CryptoEngine.decrypt(encrypted, key)
+        encrypted = CryptoEngine.encrypt_batch(plaintexts, key)
 
-        assert decrypted == plaintext
+        assert len(encrypted) == len(plaintexts)
+        assert len({item["nonce"] for item in encrypted}) == len(plaintexts)
+        assert CryptoEngine.decrypt_batch(encrypted, key) == plaintexts
+
+        # Batch output is interchangeable with single-value calls
+        assert CryptoEngine.decrypt(encrypted[1], key) == "second"
+
+    def test_draw_nonces(self):
+        """Test that batch nonces have the right size and are distinct."""
+        nonces = CryptoEngine._draw_nonces(100)
+
+        assert len(nonces) == 100
+        assert all(len(nonce) == CryptoEngine.NONCE_SIZE for nonce in nonces)
+        assert len(set(nonces)) == 100
+        assert CryptoEngine._draw_nonces(0) == []
+
+    def test_cipher_cache(self):
+        """Test that cipher objects are reused per algorithm and key."""
+        from mobile_secrets_vault.crypto import _cipher
 
-    def test_long_plaintext(self):
-        """Test encrypting large text."""
         key = CryptoEngine.generate_key()
-        plaintext = "x" * 10000  # 10KB of data
+        other = CryptoEngine.generate_key()
 
-        encrypted = CryptoEngine.encrypt(plaintext, key)
-        decrypted = CryptoEngine.decrypt(encrypted, key)
+        assert _cipher(ALG_AES_GCM, key) is _cipher(ALG_AES_GCM, key)
+        assert _cipher(ALG_AES_GCM, key) is not _cipher(ALG_AES_GCM, other)
+        assert _cipher(ALG_AES_GCM, key) is not _cipher(ALG_CHACHA20_POLY1305, key)
 
-        assert decrypted == plaintext
+    def test_batch_invalid_key_size(self):
+        """Test that batch operations validate the key once up front."""
+        with pytest.raises(ValueError, match="Key must be 32 bytes"):
+            CryptoEngine.encrypt_batch(["value"], b"short")
+
+        with pytest.raises(ValueError, match="Key must be 32 bytes"):
+            CryptoEngine.decrypt_batch([], b"short")
@@ -0,0 +1,323 @@
+"""Unit tests for the storage module."""
+
+import os
+import pytest
+import tempfile
+from pathlib import Path
+
+from mobile_secrets_vault.storage import StorageBackend, _dump_vault, _SchemaMismatch
+
+
+class TestStorageBackend:
+    """Test cases for YAML storage."""
+
+    @pytest.fixture
+    def secrets_file(self):
+        """Path to a secrets file in a temporary directory."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir) / "secrets.yaml"
+
+    def test_load_missing_file(self, secrets_file):
+        """Test that a missing file loads as an empty dict."""
+        assert StorageBackend(secrets_file).load() == {}
+
+    def test_save_and_load(self, secrets_file):
+        """Test a save/load roundtrip."""
+        storage = StorageBackend(secrets_file)
+        data = {"KEY": {"versions": [], "current_version": 0}}
+
+        storage.save(data)
+
+        assert StorageBackend(secrets_file).load() == data
+
+    def test_load_cache_returns_copies(self, secrets_file):
+        """Test that cached loads cannot be mutated by callers."""
+        storage = StorageBackend(secrets_file)
+        storage.save({"KEY": {"value": 1}})
+
+        first = storage.load()
+        first["KEY"]["value"] = 2
+
+        assert storage.load() == {"KEY": {"value": 1}}
+
+    def test_shared_load_reuses_cached_data(self, secrets_file):
+        """Test that shared loads of an unchanged file return the same object."""
+        storage = StorageBackend(secrets_file)
+        storage.save({"KEY": {"value": 1}})
+
+        shared = storage.load(shared=True)
+
+        assert storage.load(shared=True) is shared
+        assert storage.load() == shared and storage.load() is not shared
+
+    def test_load_cache_invalidated_by_external_write(self, secrets_file):
+        """Test that a file changed outside the backend is re-parsed."""
+        storage = StorageBackend(secrets_file)
+        storage.save({"KEY": "old"})
+        assert storage.load() == {"KEY": "old"}
+
+        secrets_file.write_text("KEY: newer\n")
+        os.utime(secrets_file, ns=(0, 12345))
+
+        assert storage.load() == {"KEY": "newer"}
+
+    def test_load_cache_invalidated_by_same_size_replace(self, secrets_file):
+        """Test that a same-size file renamed into place with the same mtime is re-parsed."""
+        storage = StorageBackend(secrets_file)
+        secrets_file.write_text("KEY: old\n")
+        os.utime(secrets_file, ns=(0, 12345))
+        assert storage.load() == {"KEY": "old"}
+
+        replacement = secrets_file.with_name("replacement.yaml")
+        replacement.write_text("KEY: new\n")
+        os.utime(replacement, ns=(0, 12345))
+        os.replace(replacement, secrets_file)
+
+        assert storage.load() == {"KEY": "new"}
+
+    def test_save_is_private_and_leaves_no_temp_files(self, secrets_file):
+        """Test that saves produce an owner-only file and clean up temp files."""
+        storage = StorageBackend(secrets_file)
+        storage.save({"KEY": "value"})
+        storage.save({"KEY": "value2"})
+
+        assert secrets_file.stat().st_mode & 0o777 == 0o600
+        assert not list(secrets_file.parent.glob("*.tmp*"))
+
+    def test_backup_keeps_previous_content(self, secrets_file):
+        """Test that the backup holds the file content from before the save."""
+        storage = StorageBackend(secrets_file)
+        storage.save({"KEY": "v1"})
+        storage.save({"KEY": "v2"})
+
+        backup_path = storage.get_backup_path()
+        assert backup_path is not None
+        assert "v1" in backup_path.read_text()
+        assert "v2" in secrets_file.read_text()
+
+        assert storage.restore_from_backup() is True
+        assert storage.load() == {"KEY": "v1"}
+
+    def test_save_creates_missing_directories(self, secrets_file):
+        """Test that save creates the parent directories on demand."""
+        nested = secrets_file.parent / "a" / "b" / "secrets.yaml"
+
+        StorageBackend(nested).save({"KEY": 1})
+
+        assert StorageBackend(nested).load() == {"KEY": 1}
+
+    def test_load_partial(self, secrets_file):
+        """Test that only the requested secrets are loaded."""
+        data = {"A": {"value": 1}, "B": {"value": [2]}, "C": {"value": 3}}
+        StorageBackend(secrets_file).save(data)
+        StorageBackend._cache.clear()
+
+        assert StorageBackend(secrets_file).load_partial({"A", "B", "MISSING"}) == {
+            "A": {"value": 1},
+            "B": {"value": [2]},
+        }
+
+    def test_load_partial_from_cache(self, secrets_file):
+        """Test that a partial load from the cache returns copies."""
+        storage = StorageBackend(secrets_file)
+        storage.save({"A": {"value": [1]}, "B": {"value": 2}})
+
+        partial = storage.load_partial({"A"})
+        partial["A"]["value"].append(99)
+
+        assert storage.load_partial({"A"}) == {"A": {"value": [1]}}
+
+    @pytest.mark.parametrize(
+        "key", ["API_KEY", "YES", "null", "123", "2025-01-01", "it's", "a: b", "", "x/y.z"]
+    )
+    def test_fast_serializer_roundtrip(self, secrets_file, key):
+        """Test that the schema-specific writer reads back as the same data."""
+        import yaml
+
+        version = {
+            "version": 1,
+            "encrypted_value": {
+                "ciphertext": os.urandom(40),
+                "nonce": b"\x00" * 12,
+                "alg": "AES-GCM",
+            },
+            "timestamp": "2025-01-01T00:00:00.123456Z",
+            "metadata": {"by": "ci", "tags": ["a", "on"], "n": 3, "ok": True, "none": None},
+        }
+        data = {
+            key: {"versions": [version], "current_version": 1},
+            "EMPTY": {"versions": [], "current_version": 0},
+        }
+
+        assert yaml.safe_load(_dump_vault(data)) == data
+
+        StorageBackend(secrets_file).save(data)
+        StorageBackend._cache.clear()
+        assert StorageBackend(secrets_file).load() == data
+
+    def test_fast_serializer_falls_back(self, secrets_file):
+        """Test that data outside the fast path's schema is still saved."""
+        data = {"KEY": {"versions": [{"metadata": {"note": "世界"}}], "current_version": 1}}
+
+        with pytest.raises(_SchemaMismatch):
+            _dump_vault(data)
+
+        StorageBackend(secrets_file).save(data)
+        StorageBackend._cache.clear()
+        assert StorageBackend(secrets_file).load() == data
+
+    def test_incremental_save(self, secrets_file):
+        """Test that saving only changed keys produces the same file as a full save."""
+        storage = StorageBackend(secrets_file)
+        data = {
+            "A": {"versions": [{"version": 1, "value": "a"}], "current_version": 1},
+            "B": {"versions": [{"version": 1, "value": "b"}], "current_version": 1},
+        }
+        storage.save(data)
+
+        updated = dict(data)
+        updated["B"] = {"versions": [{"version": 2, "value": "b2"}], "current_version": 2}
+        updated["C"] = {"versions": [], "current_version": 0}
+        del updated["A"]
+        storage.save(updated, changed={"A", "B", "C"})
+
+        assert secrets_file.read_text() == _dump_vault(updated)
+        StorageBackend._cache.clear()
+        assert StorageBackend(secrets_file).load() == updated
+
+    def test_msgpack_format(self, secrets_file):
+        """Test saving and loading the MessagePack format chosen by suffix."""
+        pytest.importorskip("msgpack")
+        path = secrets_file.with_suffix(".mpk")
+        data = {
+            "KEY": {
+                "versions": [{"version": 1, "encrypted_value": {"ciphertext": b"\x00\xff"}}],
+                "current_version": 1,
+            }
+        }
+
+        storage = StorageBackend(path)
+        storage.save(data)
+        StorageBackend._cache.clear()
+
+        assert storage.format == "msgpack"
+        assert not path.read_bytes().startswith(b"KEY:")
+        assert StorageBackend(path).load() == data
+        assert StorageBackend(path).load_partial({"OTHER"}) == {}
+
+    def test_msgpack_non_str_metadata_keys(self, secrets_file):
+        """Test that metadata with non-str keys survives a MessagePack round trip."""
+        pytest.importorskip("msgpack")
+        path = secrets_file.with_suffix(".mpk")
+        data = {
+            "KEY": {
+                "versions": [{"version": 1, "metadata": {1: "x", "owner": "ops"}}],
+                "current_version": 1,
+            }
+        }
+
+        StorageBackend(path).save(data)
+        StorageBackend._cache.clear()
+
+        assert StorageBackend(path).load() == data
+
+    def test_unknown_format(self, secrets_file):
+        """Test that an unknown storage format is rejected."""
+        with pytest.raises(ValueError, match="Unsupported storage format"):
+            StorageBackend(secrets_file, format="toml")
+
+    def test_load_cache_is_bounded(self, secrets_file, monkeypatch):
+        """Test that the load cache evicts the least recently used file."""
+        monkeypatch.setattr(StorageBackend, "CACHE_MAX_ENTRIES", 2)
+        StorageBackend._cache.clear()
+        backends = [StorageBackend(secrets_file.with_name(f"s{i}.yaml")) for i in range(3)]
+        for i, storage in enumerate(backends):
+            storage.save({"KEY": i})
+            if i == 1:
+                backends[0].load()
+
+        assert list(StorageBackend._cache) == [backends[0]._cache_key, backends[2]._cache_key]
+
+    def _vault_data(self, count):
+        """Secrets file data with count single-version keys."""
+        return {
+            f"KEY{i}": {"versions": [{"version": 1, "value": "v" * 40}], "current_version": 1}
+            for i in range(count)
+        }
+
+    def test_journal_append_and_reload(self, secrets_file):
+        """Test that journaled saves leave the file alone and are replayed on load."""
+        storage = StorageBackend(secrets_file, journal=True)
+        data = self._vault_data(5)
+        storage.save(data)
+        original = secrets_file.read_bytes()
+
+        data["KEY1"] = {"versions": [], "current_version": 0}
+        del data["KEY2"]
+        storage.save(data, changed={"KEY1", "KEY2"})
+
+        journal = secrets_file.with_name(secrets_file.name + ".journal")
+        assert secrets_file.read_bytes() == original
+        assert journal.stat().st_mode & 0o777 == 0o600
+        StorageBackend._cache.clear()
+        assert StorageBackend(secrets_file).load() == data
+        assert StorageBackend(secrets_file).load_partial({"KEY1", "KEY2"}) == {"KEY1": data["KEY1"]}
+
+    def test_journal_compacts_when_large(self, secrets_file):
+        """Test that the file is rewritten once the journal outgrows it."""
+        storage = StorageBackend(secrets_file, journal=True)
+        data = self._vault_data(2)
+        storage.save(data)
+        journal = secrets_file.with_name(secrets_file.name + ".journal")
+
+        for i in range(10):
+            data["KEY0"] = {"versions": [{"version": 1, "value": str(i)}], "current_version": 1}
+            storage.save(data, changed={"KEY0"})
+            assert journal.exists() or secrets_file.read_text() == _dump_vault(data)
+
+        assert secrets_file.read_text() != _dump_vault(self._vault_data(2))
+        storage.save(data)
+        assert not journal.exists()
+        StorageBackend._cache.clear()
+        assert StorageBackend(secrets_file).load() == data
+
+    def test_journal_ignores_torn_and_stale_records(self, secrets_file):
+        """Test that a partial record is dropped and a stale journal is ignored."""
+        storage = StorageBackend(secrets_file, journal=True)
+        data = self._vault_data(5)
+        storage.save(data)
+        data["KEY0"] = {"versions": [], "current_version": 0}
+        storage.save(data, changed={"KEY0"})
+
+        journal = secrets_file.with_name(secrets_file.name + ".journal")
+        with open(journal, "ab") as f:
+            f.write(b"\x40\x00\x00\x00garbage")
+        StorageBackend._cache.clear()
+        assert StorageBackend(secrets_file).load() == data
+
+        data["KEY1"] = {"versions": [], "current_version": 0}
+        StorageBackend(secrets_file, journal=True).save(data, changed={"KEY1"})
+        assert b"garbage" not in journal.read_bytes()
+        StorageBackend._cache.clear()
+        assert StorageBackend(secrets_file).load() == data
+
+        # A file replaced without removing the journal no longer matches it
+        secrets_file.write_text("{}\n")
+        assert StorageBackend(secrets_file).load() == {}
+
+    def test_journal_rejects_corrupt_record(self, secrets_file):
+        """Test that a record whose tag does not match its payload is dropped."""
+        storage = StorageBackend(secrets_file, journal=True)
+        data = self._vault_data(5)
+        storage.save(data)
+        expected = dict(data)
+        data["KEY0"] = {"versions": [], "current_version": 0}
+        storage.save(data, changed={"KEY0"})
+
+        journal = secrets_file.with_name(secrets_file.name + ".journal")
+        raw = bytearray(journal.read_bytes())
+        raw[-3] ^= 0x01
+        journal.write_bytes(bytes(raw))
+        StorageBackend._cache.clear()
+
+        assert StorageBackend(secrets_file).load() == expected
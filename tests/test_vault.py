@@ -1,7 +1,7 @@
 """Unit tests for the main Vault API."""
 
 import pytest
-import tempfile
+import shutil
 from pathlib import Path
 
 from mobile_secrets_vault import (
@@ -9,30 +9,45 @@ from mobile_secrets_vault import (
     CryptoEngine,
     MasterKeyNotFoundError,
     SecretNotFoundError,
+    VaultError,
 )
+from mobile_secrets_vault.crypto import ALG_AES_GCM
+
+
+@pytest.fixture(scope="session")
+def vault_template(tmp_path_factory):
+    """Master key file shared by the whole session."""
+    key_file = tmp_path_factory.mktemp("vault_template") / "master.key"
+    master_key = CryptoEngine.generate_key()
+    key_file.write_bytes(master_key)
+    return key_file, master_key
 
 
 class TestMobileSecretsVault:
     """Test cases for MobileSecretsVault class."""
 
     @pytest.fixture
-    def temp_vault(self):
+    def temp_vault(self, vault_template, tmp_path):
         """Create a temporary vault for testing."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmppath = Path(tmpdir)
-            key_file = tmppath / "master.key"
-            secrets_file = tmppath / "secrets.yaml"
-
-            # Generate and save master key
-            master_key = CryptoEngine.generate_key()
-            with open(key_file, "wb") as f:
-                f.write(master_key)
-
-            yield {
-                "key_file": str(key_file),
-                "secrets_file": str(secrets_file),
-                "master_key": master_key,
-            }
+        template_key_file, master_key = vault_template
+        key_file = tmp_path / "master.key"
+        shutil.copyfile(template_key_file, key_file)
+
+        return {
+            "key_file": str(key_file),
+            "secrets_file": str(tmp_path / "secrets.yaml"),
+            "master_key": master_key,
+        }
+
+    @pytest.fixture
+    def vault(self, temp_vault):
+        """In-memory vault without auditing, for tests that check neither."""
+        return MobileSecretsVault(master_key=temp_vault["master_key"], in_memory=True, audit=False)
+
+    @pytest.fixture
+    def audited_vault(self, temp_vault):
+        """In-memory vault that keeps its audit log."""
+        return MobileSecretsVault(master_key=temp_vault["master_key"], in_memory=True)
 
     def test_init_with_key_file(self, temp_vault):
         """Test initializing vault with key file."""
@@ -42,6 +57,52 @@ class TestMobileSecretsVault:
 
         assert vault.master_key == temp_vault["master_key"]
 
+    def test_key_file_rewrite_is_picked_up(self, temp_vault):
+        """Test that a replaced key file is read again rather than served from cache."""
+        import os
+
+        MobileSecretsVault(
+            master_key_file=temp_vault["key_file"], secrets_filepath=temp_vault["secrets_file"]
+        )
+
+        new_key = CryptoEngine.generate_key()
+        os.unlink(temp_vault["key_file"])
+        with open(temp_vault["key_file"], "wb") as f:
+            f.write(new_key)
+
+        vault = MobileSecretsVault(
+            master_key_file=temp_vault["key_file"], secrets_filepath=temp_vault["secrets_file"]
+        )
+        assert vault.master_key == new_key
+
+    def test_init_with_env_key(self, temp_vault, monkeypatch):
+        """Test the env var key, and falling back to the key file when it is unusable."""
+        env_key = CryptoEngine.generate_key()
+        monkeypatch.setenv("VAULT_MASTER_KEY", CryptoEngine.key_to_string(env_key))
+        vault = MobileSecretsVault(
+            master_key_file=temp_vault["key_file"], secrets_filepath=temp_vault["secrets_file"]
+        )
+        assert vault.master_key == env_key
+
+        for bad in ("too-short", "A" * 43 + "!"):
+            monkeypatch.setenv("VAULT_MASTER_KEY", bad)
+            vault = MobileSecretsVault(
+                master_key_file=temp_vault["key_file"], secrets_filepath=temp_vault["secrets_file"]
+            )
+            assert vault.master_key == temp_vault["master_key"]
+
+    @pytest.mark.parametrize("content", ["KEY: [unclosed\n", "- a\n- list\n", "KEY: 1\n"])
+    def test_malformed_file_loads_empty(self, temp_vault, content, capsys):
+        """Test that an unparsable or malformed secrets file leaves the vault empty."""
+        Path(temp_vault["secrets_file"]).write_text(content)
+
+        vault = MobileSecretsVault(
+            master_key=temp_vault["master_key"], secrets_filepath=temp_vault["secrets_file"]
+        )
+
+        assert vault.list_keys() == []
+        assert "Failed to load secrets" in capsys.readouterr().out
+
     def test_init_with_direct_key(self, temp_vault):
         """Test initializing vault with direct key parameter."""
         vault = MobileSecretsVault(
@@ -50,18 +111,13 @@ class TestMobileSecretsVault:
 
         assert vault.master_key == temp_vault["master_key"]
 
-    def test_init_without_key_fails(self):
+    def test_init_without_key_fails(self, tmp_path):
         """Test that initialization fails without a master key."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            with pytest.raises(MasterKeyNotFoundError):
-                MobileSecretsVault(secrets_filepath=str(Path(tmpdir) / "secrets.yaml"))
+        with pytest.raises(MasterKeyNotFoundError):
+            MobileSecretsVault(secrets_filepath=str(tmp_path / "secrets.yaml"))
 
-    def test_set_and_get_secret(self, temp_vault):
+    def test_set_and_get_secret(self, vault):
         """Test setting and retrieving a secret."""
-        vault = MobileSecretsVault(
-            master_key=temp_vault["master_key"], secrets_filepath=temp_vault["secrets_file"]
-        )
-
         # Set a secret
         version = vault.set("DATABASE_URL", "postgresql://localhost/mydb")
         assert version == 1
@@ -70,21 +126,13 @@ class TestMobileSecretsVault:
         value = vault.get("DATABASE_URL")
         assert value == "postgresql://localhost/mydb"
 
-    def test_get_nonexistent_secret(self, temp_vault):
+    def test_get_nonexistent_secret(self, vault):
         """Test getting a secret that doesn't exist."""
-        vault = MobileSecretsVault(
-            master_key=temp_vault["master_key"], secrets_filepath=temp_vault["secrets_file"]
-        )
-
         with pytest.raises(SecretNotFoundError):
             vault.get("NONEXISTENT")
 
-    def test_update_secret_creates_new_version(self, temp_vault):
+    def test_update_secret_creates_new_version(self, vault):
         """Test that updating a secret creates a new version."""
-        vault = MobileSecretsVault(
-            master_key=temp_vault["master_key"], secrets_filepath=temp_vault["secrets_file"]
-        )
-
         v1 = vault.set("API_KEY", "old-key-123")
         v2 = vault.set("API_KEY", "new-key-456")
 
@@ -96,12 +144,40 @@ class TestMobileSecretsVault:
         # Can still get old version
         assert vault.get("API_KEY", version=v1) == "old-key-123"
 
-    def test_delete_secret(self, temp_vault):
-        """Test deleting a secret."""
-        vault = MobileSecretsVault(
-            master_key=temp_vault["master_key"], secrets_filepath=temp_vault["secrets_file"]
-        )
+    def test_set_many(self, vault):
+        """Test setting several secrets in one call."""
+        vault.set("API_KEY", "old-key-123")
+
+        versions = vault.set_many({"API_KEY": "new-key-456", "DB_URL": "postgres://localhost"})
+
+        assert versions == {"API_KEY": 2, "DB_URL": 1}
+        assert vault.get("API_KEY") == "new-key-456"
+        assert vault.get("API_KEY", version=1) == "old-key-123"
+        assert vault.get("DB_URL") == "postgres://localhost"
+
+    def test_get_with_version(self, vault):
+        """Test retrieving a secret together with its version number."""
+        vault.set("API_KEY", "old-key-123")
+        vault.set("API_KEY", "new-key-456")
+
+        assert vault.get_with_version("API_KEY") == ("new-key-456", 2)
+        assert vault.get_with_version("API_KEY", version=1) == ("old-key-123", 1)
+
+        with pytest.raises(SecretNotFoundError):
+            vault.get_with_version("NONEXISTENT")
 
+    def test_contains(self, vault):
+        """Test membership checks without decrypting."""
+        vault.set("API_KEY", "value")
+
+        assert "API_KEY" in vault
+        assert "MISSING" not in vault
+
+        vault.delete("API_KEY")
+        assert "API_KEY" not in vault
+
+    def test_delete_secret(self, vault):
+        """Test deleting a secret."""
         vault.set("TEMP_SECRET", "temporary")
 
         # Delete should succeed
@@ -114,12 +190,8 @@ class TestMobileSecretsVault:
         # Second delete should return False
         assert vault.delete("TEMP_SECRET") is False
 
-    def test_list_versions(self, temp_vault):
+    def test_list_versions(self, vault):
         """Test listing version history."""
-        vault = MobileSecretsVault(
-            master_key=temp_vault["master_key"], secrets_filepath=temp_vault["secrets_file"]
-        )
-
         vault.set("PASSWORD", "password1")
         vault.set("PASSWORD", "password2")
         vault.set("PASSWORD", "password3")
@@ -130,18 +202,22 @@ class TestMobileSecretsVault:
         assert versions[0]["version"] == 1
         assert versions[2]["version"] == 3
 
-    def test_list_keys(self, temp_vault):
+    def test_list_keys(self, vault):
         """Test listing all secret keys."""
-        vault = MobileSecretsVault(
-            master_key=temp_vault["master_key"], secrets_filepath=temp_vault["secrets_file"]
-        )
-
         vault.set("KEY1", "value1")
         vault.set("KEY2", "value2")
         vault.set("KEY3", "value3")
 
         keys = vault.list_keys()
-        assert set(keys) == {"KEY1", "KEY2", "KEY3"}
+        assert keys == ["KEY1", "KEY2", "KEY3"]
+
+    def test_list_keys_with_counts(self, vault):
+        """Test listing keys with their version counts."""
+        vault.set("B_KEY", "v1")
+        vault.set("A_KEY", "v1")
+        vault.set("B_KEY", "v2")
+
+        assert vault.list_keys_with_counts() == [("A_KEY", 1), ("B_KEY", 2)]
 
     def test_persistence(self, temp_vault):
         """Test that secrets are persisted to disk."""
@@ -162,6 +238,144 @@ class TestMobileSecretsVault:
         # Should load the saved secret
         assert vault2.get("PERSISTENT") == "saved-value"
 
+    def test_reopened_vaults_are_independent(self, temp_vault):
+        """Test that vaults reopened from an unchanged file do not share changes."""
+        options = dict(
+            master_key=temp_vault["master_key"],
+            secrets_filepath=temp_vault["secrets_file"],
+            auto_save=False,
+        )
+        writer = MobileSecretsVault(**options)
+        writer.set_many({"KEY": "old", "OTHER": "value"})
+        writer.save()
+
+        first = MobileSecretsVault(**options)
+        second = MobileSecretsVault(**options)
+        first.set("KEY", "new")
+        first.delete("OTHER")
+
+        assert second.get("KEY") == "old"
+        assert len(second.list_versions("KEY")) == 1
+        assert MobileSecretsVault(**options).get("OTHER") == "value"
+
+    def test_listed_metadata_is_not_shared(self, temp_vault):
+        """Test that mutating listed metadata does not leak into other vaults."""
+        options = dict(
+            master_key=temp_vault["master_key"],
+            secrets_filepath=temp_vault["secrets_file"],
+        )
+        MobileSecretsVault(**options).set("KEY", "value", metadata={"owner": "ops"})
+
+        first = MobileSecretsVault(**options)
+        first.list_versions("KEY")[0]["metadata"]["owner"] = "changed"
+
+        assert first.list_versions("KEY")[0]["metadata"] == {"owner": "ops"}
+        second = MobileSecretsVault(**options)
+        assert second.list_versions("KEY")[0]["metadata"] == {"owner": "ops"}
+
+    def test_msgpack_secrets_format(self, temp_vault):
+        """Test that secrets_format selects MessagePack storage regardless of the suffix."""
+        msgpack = pytest.importorskip("msgpack")
+        options = dict(
+            master_key=temp_vault["master_key"],
+            secrets_filepath=temp_vault["secrets_file"],
+            secrets_format="msgpack",
+        )
+
+        MobileSecretsVault(**options).set("API_KEY", "value")
+
+        raw = msgpack.unpackb(Path(temp_vault["secrets_file"]).read_bytes())
+        assert raw["API_KEY"]["current_version"] == 1
+        assert MobileSecretsVault(**options).get("API_KEY") == "value"
+
+    def test_journaled_save_writes_only_changes(self, temp_vault):
+        """Test that a journaled vault appends just the changed secret on save."""
+        options = dict(
+            master_key=temp_vault["master_key"],
+            secrets_filepath=temp_vault["secrets_file"],
+            journal=True,
+        )
+        vault = MobileSecretsVault(**options)
+        vault.set_many({f"KEY{i}": "x" * 64 for i in range(50)})
+        full_size = Path(temp_vault["secrets_file"]).stat().st_size
+
+        vault.set("KEY0", "y" * 64)
+
+        journal = Path(temp_vault["secrets_file"] + ".journal")
+        assert Path(temp_vault["secrets_file"]).stat().st_size == full_size
+        assert journal.stat().st_size < full_size / 10
+        assert MobileSecretsVault(**options).get("KEY0") == "y" * 64
+
+    def test_reopened_journaled_vault_writes_only_changes(self, temp_vault):
+        """Test that secrets loaded from the file are not saved again after a reopen."""
+        options = dict(
+            master_key=temp_vault["master_key"],
+            secrets_filepath=temp_vault["secrets_file"],
+            journal=True,
+        )
+        MobileSecretsVault(**options).set_many({f"KEY{i}": "x" * 64 for i in range(50)})
+        full_size = Path(temp_vault["secrets_file"]).stat().st_size
+
+        reopened = MobileSecretsVault(**options)
+        assert reopened.version_manager.unsaved_keys() == set()
+        reopened.set("KEY1", "y" * 64)
+
+        journal = Path(temp_vault["secrets_file"] + ".journal")
+        assert Path(temp_vault["secrets_file"]).stat().st_size == full_size
+        assert journal.stat().st_size < full_size / 10
+        reloaded = MobileSecretsVault(**options)
+        assert reloaded.get("KEY1") == "y" * 64
+        assert reloaded.get("KEY2") == "x" * 64
+
+    def test_in_memory_vault(self, temp_vault):
+        """Test that an in-memory vault neither reads nor writes the secrets file."""
+        MobileSecretsVault(
+            master_key=temp_vault["master_key"], secrets_filepath=temp_vault["secrets_file"]
+        ).set("ON_DISK", "value")
+        before = Path(temp_vault["secrets_file"]).read_bytes()
+
+        vault = MobileSecretsVault(
+            master_key=temp_vault["master_key"],
+            secrets_filepath=temp_vault["secrets_file"],
+            in_memory=True,
+        )
+        vault.set("IN_MEMORY", "value")
+        vault.save()
+
+        assert vault.list_keys() == ["IN_MEMORY"]
+        assert Path(temp_vault["secrets_file"]).read_bytes() == before
+
+    def test_load_legacy_base64_file(self, temp_vault, monkeypatch):
+        """Test reading a secrets file that stores base64 strings."""
+        import base64
+        import yaml
+
+        monkeypatch.setattr(CryptoEngine, "ALGORITHM", ALG_AES_GCM)
+        encrypted = CryptoEngine.encrypt("legacy-value", temp_vault["master_key"])
+        legacy = {
+            "LEGACY": {
+                "versions": [
+                    {
+                        "version": 1,
+                        "encrypted_value": {
+                            k: base64.b64encode(encrypted[k]).decode("utf-8")
+                            for k in ("ciphertext", "nonce")
+                        },
+                        "timestamp": "2025-01-01T00:00:00Z",
+                        "metadata": {},
+                    }
+                ],
+                "current_version": 1,
+            }
+        }
+        with open(temp_vault["secrets_file"], "w") as f:
+            yaml.safe_dump(legacy, f)
+
+        vault = MobileSecretsVault(
+            master_key=temp_vault["master_key"], secrets_filepath=temp_vault["secrets_file"]
+        )
+        assert vault.get("LEGACY") == "legacy-value"
+
     def test_rotate_key(self, temp_vault):
         """Test key rotation."""
         vault = MobileSecretsVault(
@@ -183,17 +397,13 @@ class TestMobileSecretsVault:
         assert vault.master_key == new_key
         assert new_key != temp_vault["master_key"]
 
-    def test_audit_log(self, temp_vault):
+    def test_audit_log(self, audited_vault):
         """Test audit logging."""
-        vault = MobileSecretsVault(
-            master_key=temp_vault["master_key"], secrets_filepath=temp_vault["secrets_file"]
-        )
+        audited_vault.set("TEST", "value")
+        audited_vault.get("TEST")
+        audited_vault.delete("TEST")
 
-        vault.set("TEST", "value")
-        vault.get("TEST")
-        vault.delete("TEST")
-
-        logs = vault.get_audit_log()
+        logs = audited_vault.get_audit_log()
 
         # Should have logs for init, set, get, delete
         assert len(logs) >= 4
@@ -203,24 +413,110 @@ class TestMobileSecretsVault:
         assert "get" in operations
         assert "delete" in operations
 
-    def test_unicode_secrets(self, temp_vault):
-        """Test handling of Unicode in secrets."""
+    def test_audit_log_file_is_written(self, temp_vault, tmp_path):
+        """Test that save(), close() and collection write buffered audit entries."""
+        import gc
+
+        options = dict(
+            master_key=temp_vault["master_key"],
+            secrets_filepath=temp_vault["secrets_file"],
+            auto_save=False,
+        )
+        log_file = tmp_path / "audit" / "audit.log"
+
+        vault = MobileSecretsVault(audit_log_file=str(log_file), **options)
+        vault.set("A", "b")
+        vault.save()
+        assert len(log_file.read_text().splitlines()) == 2
+
+        vault.get("A")
+        vault.close()
+        assert len(log_file.read_text().splitlines()) == 3
+
+        vault = MobileSecretsVault(audit_log_file=str(log_file), **options)
+        del vault
+        gc.collect()
+        assert len(log_file.read_text().splitlines()) == 4
+
+    def test_partial_vault_is_read_only(self, temp_vault):
+        """Test that a vault opened with a subset of keys only loads those."""
         vault = MobileSecretsVault(
             master_key=temp_vault["master_key"], secrets_filepath=temp_vault["secrets_file"]
         )
+        vault.set("A", "a")
+        vault.set("B", "b")
+
+        partial = MobileSecretsVault(
+            master_key=temp_vault["master_key"],
+            secrets_filepath=temp_vault["secrets_file"],
+            keys={"A"},
+        )
 
+        assert partial.get("A") == "a"
+        assert "B" not in partial
+        with pytest.raises(VaultError, match="read-only"):
+            partial.set("C", "c")
+
+    def test_plaintext_cache(self, temp_vault, monkeypatch):
+        """Test that cached plaintexts skip decryption and are invalidated."""
+        vault = MobileSecretsVault(
+            master_key=temp_vault["master_key"],
+            secrets_filepath=temp_vault["secrets_file"],
+            plaintext_cache_size=2,
+        )
+        vault.set("A", "a1")
+        assert vault.get("A") == "a1"
+
+        calls = []
+        decrypt = vault.crypto.decrypt
+        monkeypatch.setattr(vault.crypto, "decrypt", lambda *a: calls.append(a) or decrypt(*a))
+
+        assert vault.get("A") == "a1"
+        assert calls == []
+
+        # Deleting and re-creating a key reuses version 1
+        vault.delete("A")
+        vault.set("A", "new")
+        assert vault.get("A") == "new"
+        assert len(calls) == 1
+
+        # Least recently used entries are evicted
+        vault.set("B", "b")
+        vault.set("C", "c")
+        vault.get("B")
+        vault.get("C")
+        vault.get("A")
+        assert len(calls) == 4
+
+    def test_audit_disabled(self, vault):
+        """Test that a vault opened with audit=False records nothing."""
+        vault.set("TEST", "value")
+        vault.get("TEST")
+
+        assert vault.get_audit_log() == []
+
+    def test_audit_log_for_key(self, audited_vault):
+        """Test that key-filtered audit logs are the most recent for that key."""
+        audited_vault.set("A", "1")
+        audited_vault.set("B", "1")
+        audited_vault.get("A")
+        audited_vault.set("A", "2")
+
+        logs = audited_vault.get_audit_log(key="A", limit=2)
+
+        assert [log["operation"] for log in logs] == ["set", "get"]
+        assert all(log["key"] == "A" for log in logs)
+
+    def test_unicode_secrets(self, vault):
+        """Test handling of Unicode in secrets."""
         unicode_value = "Hello 世界 🔐 Password"
         vault.set("UNICODE_KEY", unicode_value)
 
         retrieved = vault.get("UNICODE_KEY")
         assert retrieved == unicode_value
 
-    def test_long_secret_value(self, temp_vault):
+    def test_long_secret_value(self, vault):
         """Test storing large secret values."""
-        vault = MobileSecretsVault(
-            master_key=temp_vault["master_key"], secrets_filepath=temp_vault["secrets_file"]
-        )
-
         long_value = "x" * 10000  # 10KB
         vault.set("LONG_SECRET", long_value)
 
@@ -1,10 +1,23 @@
 """Unit tests for the versioning module."""
 
 import pytest
+from cryptography.exceptions import InvalidTag
 from mobile_secrets_vault.versioning import VersionManager, SecretVersion
 from mobile_secrets_vault.crypto import CryptoEngine
 
 
+@pytest.fixture(scope="session")
+def old_key():
+    """Key that rotation tests rotate away from."""
+    return CryptoEngine.generate_key()
+
+
+@pytest.fixture(scope="session")
+def new_key():
+    """Key that rotation tests rotate to."""
+    return CryptoEngine.generate_key()
+
+
 class TestSecretVersion:
     """Test SecretVersion class."""
 
@@ -18,6 +31,17 @@ class TestSecretVersion:
         assert version.metadata["source"] == "test"
         assert version.timestamp is not None
 
+    def test_default_timestamp_format(self):
+        """Test that new versions get an ISO-8601 UTC timestamp with microseconds."""
+        from datetime import datetime, timezone
+
+        version = SecretVersion(version=1, encrypted_value={})
+
+        assert version.timestamp.endswith("Z")
+        parsed = datetime.strptime(version.timestamp, "%Y-%m-%dT%H:%M:%S.%fZ")
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        assert abs((now - parsed).total_seconds()) < 60
+
     def test_to_dict(self):
         """Test conversion to dictionary."""
         encrypted = {"ciphertext": "abc", "nonce": "xyz"}
@@ -43,6 +67,15 @@ class TestSecretVersion:
         assert version.timestamp == data["timestamp"]
         assert version.metadata == data["metadata"]
 
+    def test_from_dict_defaults(self):
+        """Test that missing optional fields get the same defaults as the constructor."""
+        version = SecretVersion.from_dict(
+            {"version": 1, "encrypted_value": {"ciphertext": "c", "nonce": "n"}, "metadata": None}
+        )
+
+        assert version.timestamp.endswith("Z")
+        assert version.metadata == {}
+
 
 class TestVersionManager:
     """Test VersionManager class."""
@@ -67,6 +100,26 @@ class TestVersionManager:
         assert v1 == 1
         assert v2 == 2
 
+    def test_add_versions_bulk(self):
+        """Test adding versions for several keys at once."""
+        manager = VersionManager()
+        manager.add_version("API_KEY", {"ciphertext": "old", "nonce": "1"})
+
+        latest = manager.add_versions_bulk(
+            {
+                "API_KEY": [{"ciphertext": "new", "nonce": "2"}],
+                "DB_URL": [{"ciphertext": "a", "nonce": "3"}, {"ciphertext": "b", "nonce": "4"}],
+                "EMPTY": [],
+            },
+            metadata={"source": "import"},
+        )
+
+        assert latest == {"API_KEY": 2, "DB_URL": 2}
+        assert "EMPTY" not in manager
+        assert manager.get_version("DB_URL", 1).encrypted_value["ciphertext"] == "a"
+        assert manager.get_version("DB_URL").metadata == {"source": "import"}
+        assert manager.unsaved_keys() == {"API_KEY", "DB_URL"}
+
     def test_get_latest_version(self):
         """Test retrieving the latest version."""
         manager = VersionManager()
@@ -119,6 +172,21 @@ class TestVersionManager:
         assert versions[1]["version"] == 2
         assert "timestamp" in versions[0]
 
+    def test_list_versions_cache_invalidated(self):
+        """Test that cached listings follow later changes to the key."""
+        manager = VersionManager()
+        manager.add_version("KEY", {"ciphertext": "v1", "nonce": "1"})
+
+        first = manager.list_versions("KEY")
+        first.clear()
+        assert len(manager.list_versions("KEY")) == 1
+
+        manager.add_version("KEY", {"ciphertext": "v2", "nonce": "2"})
+        assert [v["version"] for v in manager.list_versions("KEY")] == [1, 2]
+
+        manager.delete_key("KEY")
+        assert manager.list_versions("KEY") == []
+
     def test_delete_key(self):
         """Test deleting all versions of a key."""
         manager = VersionManager()
@@ -148,6 +216,41 @@ class TestVersionManager:
         versions = manager.list_versions("KEY")
         assert len(versions) == 2
         assert 2 not in [v["version"] for v in versions]
+        assert manager.get_version("KEY", 2) is None
+        assert manager.delete_version("KEY", 2) is False
+
+    def test_get_version_after_from_dict(self):
+        """Test looking up specific versions of imported secrets."""
+        manager = VersionManager()
+        manager.add_version("KEY", {"ciphertext": "v1", "nonce": "1"})
+        manager.add_version("KEY", {"ciphertext": "v2", "nonce": "2"})
+
+        imported = VersionManager()
+        imported.from_dict(manager.to_dict())
+
+        assert imported.get_version("KEY", 1).encrypted_value["ciphertext"] == "v1"
+        assert imported.get_version("KEY", 2).encrypted_value["ciphertext"] == "v2"
+        assert imported.get_version("KEY", 3) is None
+
+    def test_unsaved_keys(self):
+        """Test tracking of keys changed since the last save."""
+        manager = VersionManager()
+        manager.add_version("KEY1", {"ciphertext": "v1", "nonce": "1"})
+        manager.add_version("KEY2", {"ciphertext": "v2", "nonce": "2"})
+
+        assert manager.unsaved_keys() == {"KEY1", "KEY2"}
+        first = manager.to_dict()
+        manager.mark_saved({"KEY1", "KEY2"})
+        assert manager.unsaved_keys() == set()
+
+        manager.add_version("KEY2", {"ciphertext": "v3", "nonce": "3"})
+        manager.delete_key("KEY1")
+        second = manager.to_dict()
+
+        assert manager.unsaved_keys() == {"KEY1", "KEY2"}
+        assert "KEY1" not in second
+        assert len(second["KEY2"]["versions"]) == 2
+        assert len(first["KEY2"]["versions"]) == 1
 
     def test_get_all_keys(self):
         """Test getting all secret keys."""
@@ -158,15 +261,18 @@ class TestVersionManager:
         manager.add_version("KEY3", {"ciphertext": "v3", "nonce": "3"})
 
         keys = manager.get_all_keys()
-        assert set(keys) == {"KEY1", "KEY2", "KEY3"}
+        assert keys == ["KEY1", "KEY2", "KEY3"]
 
     def test_to_from_dict(self):
         """Test serialization and deserialization."""
         manager1 = VersionManager()
 
-        manager1.add_version("SECRET1", {"ciphertext": "v1", "nonce": "1"})
-        manager1.add_version("SECRET1", {"ciphertext": "v2", "nonce": "2"})
-        manager1.add_version("SECRET2", {"ciphertext": "v1", "nonce": "3"})
+        manager1.add_versions_bulk(
+            {
+                "SECRET1": [{"ciphertext": "v1", "nonce": "1"}, {"ciphertext": "v2", "nonce": "2"}],
+                "SECRET2": [{"ciphertext": "v1", "nonce": "3"}],
+            }
+        )
 
         # Export to dict
         data = manager1.to_dict()
@@ -180,14 +286,104 @@ class TestVersionManager:
         assert len(manager2.list_versions("SECRET1")) == 2
         assert len(manager2.list_versions("SECRET2")) == 1
 
-    def test_rotate_key(self):
+    def test_from_dict_fast_defers_versions(self, monkeypatch):
+        """Test that the fast import builds versions only for the keys accessed."""
+        manager1 = VersionManager()
+        manager1.add_versions_bulk(
+            {
+                "SECRET1": [{"ciphertext": "v1", "nonce": "1"}, {"ciphertext": "v2", "nonce": "2"}],
+                "SECRET2": [{"ciphertext": "AAH/", "nonce": "AQID"}],
+            }
+        )
+        data = manager1.to_dict()
+
+        created = []
+        from_dict = SecretVersion.from_dict
+
+        def counting_from_dict(data):
+            created.append(data)
+            return from_dict(data)
+
+        monkeypatch.setattr(SecretVersion, "from_dict", counting_from_dict)
+
+        manager2 = VersionManager.from_dict_fast(data)
+        assert created == []
+        assert manager2.get_all_keys() == ["SECRET1", "SECRET2"]
+        assert manager2.version_counts() == [("SECRET1", 2), ("SECRET2", 1)]
+        assert "SECRET1" in manager2
+
+        assert manager2.get_version("SECRET2").encrypted_value == {
+            "ciphertext": b"\x00\x01\xff",
+            "nonce": b"\x01\x02\x03",
+        }
+        assert len(created) == 1
+        assert len(manager2.list_versions("SECRET1")) == 2
+        assert manager2.add_version("SECRET1", {"ciphertext": "v3", "nonce": "3"}) == 3
+
+        # The export is left untouched
+        assert data["SECRET2"]["versions"][0]["encrypted_value"]["ciphertext"] == "AAH/"
+        assert len(data["SECRET1"]["versions"]) == 2
+
+    def test_from_dict_fast_concurrent_first_access(self):
+        """Test that threads racing to read a deferred key all see its versions."""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        class SlowCheckSet(set):
+            """Widens the gap between checking for a deferred key and building it."""
+
+            def __contains__(self, item):
+                found = super().__contains__(item)
+                time.sleep(0.005)
+                return found
+
+        manager1 = VersionManager()
+        manager1.add_versions_bulk({"KEY": [{"ciphertext": "c", "nonce": "n"}] * 20})
+        manager2 = VersionManager.from_dict_fast(manager1.to_dict())
+        manager2._lazy = SlowCheckSet(manager2._lazy)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            latest = list(pool.map(lambda _: manager2.get_version("KEY").version, range(8)))
+
+        assert latest == [20] * 8
+
+    def test_from_dict_fast_rejects_malformed_keys(self):
+        """Test that key-level problems are reported on import."""
+        with pytest.raises(ValueError):
+            VersionManager.from_dict_fast({"KEY": {"versions": "nope", "current_version": 1}})
+
+    def test_from_dict_decodes_legacy_base64(self):
+        """Test that base64 values from earlier versions are decoded once on load."""
+        manager = VersionManager()
+        manager.from_dict(
+            {
+                "KEY": {
+                    "versions": [
+                        {"version": 1, "encrypted_value": {"ciphertext": "AAH/", "nonce": "AQID"}},
+                        {
+                            "version": 2,
+                            "encrypted_value": {"ciphertext": b"\x01", "nonce": b"\x02"},
+                        },
+                    ],
+                    "current_version": 2,
+                }
+            }
+        )
+
+        assert manager.get_version("KEY", 1).encrypted_value == {
+            "ciphertext": b"\x00\x01\xff",
+            "nonce": b"\x01\x02\x03",
+        }
+        assert manager.get_version("KEY").encrypted_value == {
+            "ciphertext": b"\x01",
+            "nonce": b"\x02",
+        }
+
+    def test_rotate_key(self, old_key, new_key):
         """Test key rotation."""
         manager = VersionManager()
         crypto = CryptoEngine()
 
-        old_key = crypto.generate_key()
-        new_key = crypto.generate_key()
-
         # Add encrypted secrets
         plaintext1 = "secret value 1"
         plaintext2 = "secret value 2"
@@ -212,5 +408,27 @@ class TestVersionManager:
         assert decrypted2 == plaintext2
 
         # Should NOT work with old key
-        with pytest.raises(Exception):
+        with pytest.raises(InvalidTag):
             crypto.decrypt(v1.encrypted_value, old_key)
+
+    def test_rotate_key_in_parallel(self, monkeypatch, old_key, new_key):
+        """Test that chunked rotation on a thread pool re-encrypts every version."""
+        import mobile_secrets_vault.versioning as versioning
+
+        monkeypatch.setattr(versioning, "_ROTATE_CHUNK", 4)
+        manager = VersionManager()
+        crypto = CryptoEngine()
+
+        for i in range(10):
+            manager.add_version(f"KEY{i % 3}", crypto.encrypt(f"value {i}", old_key))
+        # One value that cannot be decrypted is skipped, not fatal
+        manager.add_version("BROKEN", crypto.encrypt("x", crypto.generate_key()))
+
+        manager.rotate_key(old_key, new_key, crypto, max_workers=2)
+
+        values = [
+            crypto.decrypt(v.encrypted_value, new_key)
+            for key in ("KEY0", "KEY1", "KEY2")
+            for v in manager._secrets[key]["versions"]
+        ]
+        assert sorted(values) == sorted(f"value {i}" for i in range(10))
@@ -3,6 +3,8 @@
 Verification script to test Mobile Secrets Vault functionality.
 
 This script tests the core functionality without requiring full installation.
+Run it directly for a summary, or collect the checks with pytest, e.g.
+``pytest -n 3 verify.py`` to run them in parallel with pytest-xdist.
 """
 
 import sys
@@ -11,6 +13,7 @@ import os
 # Add src to path for testing
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+from cryptography.exceptions import InvalidTag
 from mobile_secrets_vault import MobileSecretsVault, CryptoEngine
 from pathlib import Path
 import tempfile
@@ -26,7 +29,7 @@ def test_crypto():
     
     # Encrypt
     encrypted = CryptoEngine.encrypt(plaintext, key)
-    print(f"   ✅ Encrypted: {encrypted['ciphertext'][:20]}...")
+    print(f"   ✅ Encrypted: {encrypted['ciphertext'][:20].hex()}...")
     
     # Decrypt
     decrypted = CryptoEngine.decrypt(encrypted, key)
@@ -36,14 +39,12 @@ def test_crypto():
     # Test tampering detection
     try:
         tampered = encrypted.copy()
-        tampered['ciphertext'] = tampered['ciphertext'][:-5] + 'XXXXX'
+        tampered['ciphertext'] = tampered['ciphertext'][:-5] + b'XXXXX'
         CryptoEngine.decrypt(tampered, key)
-        print("   ❌ Tampering not detected!")
-        return False
-    except:
+    except InvalidTag:
         print("   ✅ Tampering detected correctly")
-    
-    return True
+    else:
+        raise AssertionError("Tampering not detected")
 
 
 def test_vault():
@@ -57,7 +58,12 @@ def test_vault():
         # Generate master key
         master_key = CryptoEngine.generate_key()
         key_file = Path(tmpdir) / 'master.key'
-        secrets_file = Path(tmpdir) / 'secrets.yaml'
+        # Binary MessagePack loads much faster than YAML when the extra is installed
+        try:
+            import msgpack  # noqa: F401
+            secrets_file = Path(tmpdir) / 'secrets.msgpack'
+        except ImportError:
+            secrets_file = Path(tmpdir) / 'secrets.yaml'
         
         with open(key_file, 'wb') as f:
             f.write(master_key)
@@ -70,8 +76,11 @@ def test_vault():
         print("   ✅ Vault initialized")
         
         # Set secrets
-        v1 = vault.set('DATABASE_URL', 'postgresql://localhost/mydb')
-        v2 = vault.set('API_KEY', 'secret-key-12345')
+        versions = vault.set_many({
+            'DATABASE_URL': 'postgresql://localhost/mydb',
+            'API_KEY': 'secret-key-12345',
+        })
+        v1, v2 = versions['DATABASE_URL'], versions['API_KEY']
         print(f"   ✅ Secrets set (versions: {v1}, {v2})")
         
         # Get secrets
@@ -97,7 +106,7 @@ def test_vault():
         
         # Test list keys
         keys = vault.list_keys()
-        assert set(keys) == {'DATABASE_URL', 'API_KEY'}
+        assert keys == ['DATABASE_URL', 'API_KEY']
         print(f"   ✅ Keys listed: {keys}")
         
         # Test delete
@@ -124,8 +133,6 @@ def test_vault():
         assert len(logs) > 0
         print(f"   ✅ Audit log has {len(logs)} entries")
         
-        return True
-        
     finally:
         # Cleanup
         shutil.rmtree(tmpdir, ignore_errors=True)
@@ -135,12 +142,17 @@ def test_cli_basic():
     """Test that CLI module can be imported."""
     print("\n🧪 Testing CLI Import...")
     
+    from mobile_secrets_vault import cli  # noqa: F401
+    print("   ✅ CLI module imported successfully")
+
+
+def _passed(check):
+    """Run one check, reporting instead of raising its failure."""
     try:
-        from mobile_secrets_vault import cli
-        print("   ✅ CLI module imported successfully")
+        check()
         return True
     except Exception as e:
-        print(f"   ❌ CLI import failed: {e}")
+        print(f"   ❌ {type(e).__name__}: {e}")
         return False
 
 
@@ -153,9 +165,9 @@ def main():
     results = []
     
     # Run tests
-    results.append(("Encryption", test_crypto()))
-    results.append(("Vault Operations", test_vault()))
-    results.append(("CLI Import", test_cli_basic()))
+    results.append(("Encryption", _passed(test_crypto)))
+    results.append(("Vault Operations", _passed(test_vault)))
+    results.append(("CLI Import", _passed(test_cli_basic)))
     
     # Print summary
     print("\n" + "=" * 60)